@@ -1,10 +1,13 @@
 """Streamlit chat application for ADO RAG."""
 
 import logging
+import os
+import tempfile
 import time
 from datetime import datetime
 
 import streamlit as st
+from filelock import FileLock, Timeout
 
 from src.ado_service import ADOConnector
 from src.embedding_service import EmbeddingService
@@ -21,60 +24,94 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Minimum interval (seconds) and chunk count between streaming chat re-renders
+STREAM_RENDER_INTERVAL = 0.05
+STREAM_RENDER_CHUNKS = 8
+
+# Process-wide sync lock shared by every session (and every app process on this host)
+_SYNC_LOCK = FileLock(os.path.join(tempfile.gettempdir(), "adorag_sync.lock"))
+# Exists while a sync holds the lock, so reruns can check for one without touching the lock
+_SYNC_MARKER = os.path.join(tempfile.gettempdir(), "adorag_sync.lock.active")
+
 
 @st.cache_resource
+def _get_config():
+    """Load and validate configuration once per process."""
+    config = load_config()
+    validate_config(config)
+
+    # Setup logging
+    setup_logging(config["log_level"])
+    return config
+
+
+@st.cache_resource
+def _get_ado(config):
+    """Create the cached Azure DevOps connector."""
+    return ADOConnector(
+        organization_url=config["ado_organization"],
+        personal_access_token=config["ado_pat"],
+    )
+
+
+@st.cache_resource
+def _get_embedding(config):
+    """Create the cached embedding service."""
+    return EmbeddingService(
+        endpoint=config["openai_endpoint"],
+        api_key=config["openai_api_key"],
+        api_version=config["openai_api_version"],
+        deployment_name=config["openai_embedding_deployment"],
+    )
+
+
+@st.cache_resource
+def _get_search(config):
+    """Create the cached search index manager."""
+    return SearchIndexManager(
+        endpoint=config["search_endpoint"],
+        api_key=config["search_api_key"],
+        index_name=config["search_index_name"],
+        hnsw_m=config["hnsw_m"],
+        hnsw_ef_construction=config["hnsw_ef_construction"],
+        hnsw_ef_search=config["hnsw_ef_search"],
+    )
+
+
+@st.cache_resource
+def _get_sync(config, _ado_connector, _embedding_service, _search_manager):
+    """Create the cached sync manager, keyed on the config that keys its services."""
+    return SyncManager(
+        ado_connector=_ado_connector,
+        embedding_service=_embedding_service,
+        search_manager=_search_manager,
+        project_name=config["ado_project_name"],
+    )
+
+
+@st.cache_resource
+def _get_rag(config, _embedding_service, _search_manager):
+    """Create the cached RAG service, keyed on the config that keys its services."""
+    return RAGService(
+        openai_endpoint=config["openai_endpoint"],
+        openai_api_key=config["openai_api_key"],
+        openai_api_version=config["openai_api_version"],
+        chat_deployment_name=config["openai_chat_deployment"],
+        embedding_service=_embedding_service,
+        search_manager=_search_manager,
+    )
+
+
 def initialize_services():
-    """Initialize all services with caching."""
+    """Compose services from independently cached factories."""
     try:
-        # Load configuration
-        config = load_config()
-        validate_config(config)
-
-        # Setup logging
-        setup_logging(config["log_level"])
-        logger = logging.getLogger(__name__)
-        logger.info("Initializing services...")
-
-        # Initialize Azure DevOps connector
-        ado_connector = ADOConnector(
-            organization_url=config["ado_organization"],
-            personal_access_token=config["ado_pat"],
-        )
-
-        # Initialize embedding service
-        embedding_service = EmbeddingService(
-            endpoint=config["openai_endpoint"],
-            api_key=config["openai_api_key"],
-            api_version=config["openai_api_version"],
-            deployment_name=config["openai_embedding_deployment"],
-        )
-
-        # Initialize search manager
-        search_manager = SearchIndexManager(
-            endpoint=config["search_endpoint"],
-            api_key=config["search_api_key"],
-            index_name=config["search_index_name"],
-        )
-
-        # Initialize sync manager
-        sync_manager = SyncManager(
-            ado_connector=ado_connector,
-            embedding_service=embedding_service,
-            search_manager=search_manager,
-            project_name=config["ado_project_name"],
-        )
-
-        # Initialize RAG service
-        rag_service = RAGService(
-            openai_endpoint=config["openai_endpoint"],
-            openai_api_key=config["openai_api_key"],
-            openai_api_version=config["openai_api_version"],
-            chat_deployment_name=config["openai_chat_deployment"],
-            embedding_service=embedding_service,
-            search_manager=search_manager,
-        )
-
-        logger.info("Services initialized successfully")
+        config = _get_config()
+
+        ado_connector = _get_ado(config)
+        embedding_service = _get_embedding(config)
+        search_manager = _get_search(config)
+        sync_manager = _get_sync(config, ado_connector, embedding_service, search_manager)
+        rag_service = _get_rag(config, embedding_service, search_manager)
 
         return {
             "config": config,
@@ -88,68 +125,110 @@ def initialize_services():
         st.stop()
 
 
+@st.cache_data(ttl=60)
+def _cached_index_exists(_search_manager):
+    """Check index existence, cached briefly across reruns."""
+    return _search_manager.index_exists()
+
+
+@st.cache_data(ttl=60)
+def _cached_sync_metadata(_search_manager):
+    """Fetch sync metadata, cached briefly across reruns."""
+    return _search_manager.get_sync_metadata()
+
+
+def is_sync_locked():
+    """Check whether any session currently holds the sync lock."""
+    if not os.path.exists(_SYNC_MARKER):
+        return False
+
+    # The marker may be left over from a process that crashed mid-sync
+    try:
+        _SYNC_LOCK.acquire(timeout=0)
+    except Timeout:
+        return True
+    try:
+        if os.path.exists(_SYNC_MARKER):
+            os.remove(_SYNC_MARKER)
+    finally:
+        _SYNC_LOCK.release()
+    return False
+
+
 def perform_sync(sync_manager, force_full=False):
     """Perform synchronization operation."""
-    # Check if sync is already in progress
-    if st.session_state.get("sync_in_progress", False):
+    # Check if sync is already in progress in this or any other session
+    try:
+        _SYNC_LOCK.acquire(timeout=1)
+    except Timeout:
         st.warning("⚠️ Sync is already in progress. Please wait for it to complete.")
         return
-    
-    # Set sync lock
-    st.session_state.sync_in_progress = True
-    
-    progress_bar = st.progress(0, text="🔄 Starting sync...")
-    status_text = st.empty()
-    
-    def update_progress(step, current, total, message):
-        """Update progress bar and status text."""
-        progress_pct = int((current / total) * 100) if total > 0 else 0
-        progress_bar.progress(progress_pct, text=message)
-    
+
     try:
-        start_time = time.time()
-
-        synced_count, total_count = sync_manager.sync(
-            force_full_sync=force_full,
-            progress_callback=update_progress
-        )
-
-        elapsed_time = time.time() - start_time
-        progress_bar.progress(100, text="✅ Sync complete!")
-
-        status_text.success(
-            f"✅ Sync completed in {elapsed_time:.1f}s\n\n"
-            f"- **Items synced**: {synced_count}\n"
-            f"- **Total items**: {total_count}"
-        )
-
-        # Update session state
-        st.session_state.last_sync_time = datetime.now()
-        st.session_state.work_item_count = total_count
-        st.session_state.sync_completed = True
-        
-        # Note: Even if metadata update fails, work items are still indexed and searchable
+        open(_SYNC_MARKER, "w").close()
 
-    except Exception as e:
-        progress_bar.empty()
-        
-        # Check if sync completed but only metadata update failed
-        if "Edm.DateTimeOffset" in str(e) or "sync metadata" in str(e).lower():
-            status_text.warning(
-                f"⚠️ Sync completed but metadata update failed\n\n"
-                f"Work items were successfully indexed and are searchable.\n"
-                f"You can retry sync to update metadata.\n\n"
-                f"Error: {str(e)}"
+        # Set sync lock
+        st.session_state.sync_in_progress = True
+
+        progress_bar = st.progress(0, text="🔄 Starting sync...")
+        status_text = st.empty()
+
+        def update_progress(step, current, total, message):
+            """Update progress bar and status text."""
+            progress_pct = int((current / total) * 100) if total > 0 else 0
+            progress_bar.progress(progress_pct, text=message)
+
+        try:
+            start_time = time.time()
+
+            synced_count, total_count = sync_manager.sync(
+                force_full_sync=force_full,
+                progress_callback=update_progress
+            )
+
+            elapsed_time = time.time() - start_time
+            progress_bar.progress(100, text="✅ Sync complete!")
+
+            status_text.success(
+                f"✅ Sync completed in {elapsed_time:.1f}s\n\n"
+                f"- **Items synced**: {synced_count}\n"
+                f"- **Total items**: {total_count}"
             )
-            # Still mark as completed since work items were synced
+
+            # Update session state
+            st.session_state.last_sync_time = datetime.now()
+            st.session_state.work_item_count = total_count
             st.session_state.sync_completed = True
-        else:
-            status_text.error(f"❌ Sync failed: {str(e)}")
-            logging.getLogger(__name__).error(f"Sync failed: {str(e)}", exc_info=True)
-    
+
+            # Note: Even if metadata update fails, work items are still indexed and searchable
+
+        except Exception as e:
+            progress_bar.empty()
+
+            # Check if sync completed but only metadata update failed
+            if "Edm.DateTimeOffset" in str(e) or "sync metadata" in str(e).lower():
+                # Not marked as completed: the next delta sync resumes from the local checkpoint
+                status_text.warning(
+                    f"⚠️ Work items were indexed but the sync metadata update failed\n\n"
+                    f"Indexed items are searchable. The next delta sync will resume "
+                    f"from the last indexed change.\n\n"
+                    f"Error: {str(e)}"
+                )
+                logging.getLogger(__name__).warning(f"Sync metadata update failed: {str(e)}")
+            else:
+                status_text.error(f"❌ Sync failed: {str(e)}")
+                logging.getLogger(__name__).error(f"Sync failed: {str(e)}", exc_info=True)
+
     finally:
         # Clear sync lock
         st.session_state.sync_in_progress = False
+        if os.path.exists(_SYNC_MARKER):
+            os.remove(_SYNC_MARKER)
+        _SYNC_LOCK.release()
+
+        # Index state may have changed; drop cached lookups
+        _cached_index_exists.clear()
+        _cached_sync_metadata.clear()
 
 
 def check_initial_sync(services):
@@ -162,14 +241,14 @@ def check_initial_sync(services):
         return
 
     # Check if index exists and has data
-    if not search_manager.index_exists():
+    if not _cached_index_exists(search_manager):
         st.info("🔄 Performing initial sync - this may take a few minutes...")
         perform_sync(sync_manager, force_full=True)
         st.session_state.initial_sync_completed = True
         st.rerun()
     else:
         # Check if index has data
-        metadata = search_manager.get_sync_metadata()
+        metadata = _cached_sync_metadata(search_manager)
         if metadata and metadata.get("work_item_count", 0) > 0:
             st.session_state.last_sync_time = datetime.fromisoformat(
                 metadata["last_sync_time"].replace("Z", "+00:00")
@@ -211,7 +290,7 @@ def render_sidebar(services):
         # Sync controls
         st.subheader("🔄 Sync Controls")
         
-        sync_in_progress = st.session_state.get("sync_in_progress", False)
+        sync_in_progress = st.session_state.get("sync_in_progress", False) or is_sync_locked()
 
         col1, col2 = st.columns(2)
 
@@ -272,13 +351,28 @@ def render_chat_interface(services):
         # Generate response
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
+            response_parts = []
             full_response = ""
 
             try:
-                for chunk in rag_service.query(question=prompt, top_k=5):
-                    full_response += chunk
-                    message_placeholder.markdown(full_response + "▌")
+                last_render = time.monotonic()
+                chunks_since_render = 0
 
+                for chunk in rag_service.query(question=prompt, top_k=5):
+                    response_parts.append(chunk)
+                    chunks_since_render += 1
+
+                    # Throttle re-renders; each one ships the whole response to the browser
+                    now = time.monotonic()
+                    if (
+                        now - last_render >= STREAM_RENDER_INTERVAL
+                        or chunks_since_render >= STREAM_RENDER_CHUNKS
+                    ):
+                        message_placeholder.markdown("".join(response_parts) + "▌")
+                        last_render = now
+                        chunks_since_render = 0
+
+                full_response = "".join(response_parts)
                 message_placeholder.markdown(full_response)
 
             except Exception as e:
@@ -1,19 +1,82 @@
 """Azure DevOps connector for fetching work items."""
 
+import itertools
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import random
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 from azure.devops.connection import Connection
 from azure.devops.v7_1.work_item_tracking import WorkItemTrackingClient
 from msrest.authentication import BasicAuthentication
+from msrest.exceptions import ClientRequestError, HttpOperationError
+
+# Try to import selectolax for HTML cleaning; fall back to regex stripping without it
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
 
 logger = logging.getLogger(__name__)
 
+# Patterns for the regex-based HTML cleaning fallback
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+# HTTP status codes for throttling and transient server failures
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Error messages raised by the ADO SDK for those status codes, when no code is attached
+_RETRYABLE_STATUS_RE = re.compile(r"returned a (429|50[0234]) status code")
+
+# Work item fields read by _extract_work_item_data, with their defaults, in unpacking order
+_WORK_ITEM_FIELDS = (
+    ("System.Title", ""),
+    ("System.Description", ""),
+    ("System.WorkItemType", ""),
+    ("System.State", ""),
+    ("System.AssignedTo", ""),
+    ("System.Tags", ""),
+    ("System.CreatedDate", None),
+    ("System.ChangedDate", None),
+    ("Microsoft.VSTS.Common.AcceptanceCriteria", ""),
+    ("Microsoft.VSTS.TCM.ReproSteps", ""),
+    ("Microsoft.VSTS.Common.Priority", ""),
+    ("Microsoft.VSTS.Common.Severity", ""),
+)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Check whether a failed Azure DevOps request is worth retrying.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True for throttling and transient server failures
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code in _RETRYABLE_STATUS_CODES
+    return _RETRYABLE_STATUS_RE.search(str(error)) is not None
+
 
 class ADOConnector:
     """Connector for Azure DevOps API to fetch work items."""
 
+    # WIQL template for listing every work item ID in a project
+    ALL_IDS_WIQL = """
+            SELECT [System.Id]
+            FROM WorkItems
+            WHERE [System.TeamProject] = '{project_name}'
+        """
+
     def __init__(self, organization_url: str, personal_access_token: str):
         """
         Initialize ADO connector.
@@ -35,6 +98,7 @@ class ADOConnector:
         project_name: str,
         last_sync_time: Optional[datetime] = None,
         batch_size: int = 200,
+        max_workers: int = 8,
     ) -> List[Dict[str, Any]]:
         """
         Fetch work items from Azure DevOps project.
@@ -43,22 +107,65 @@ class ADOConnector:
             project_name: Name of the ADO project
             last_sync_time: If provided, fetch only items changed after this time (delta sync)
             batch_size: Number of work items to fetch per batch
+            max_workers: Maximum number of batches fetched concurrently
 
         Returns:
             List of work item dictionaries with extracted metadata
         """
+        work_items = []
+        for content, metadata in self.iter_work_items(
+            project_name=project_name,
+            last_sync_time=last_sync_time,
+            batch_size=batch_size,
+            max_workers=max_workers,
+        ):
+            metadata["content"] = content
+            work_items.append(metadata)
+        return work_items
+
+    def iter_work_items(
+        self,
+        project_name: str,
+        last_sync_time: Optional[datetime] = None,
+        batch_size: int = 200,
+        max_workers: int = 8,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream work items from Azure DevOps project as batches arrive.
+
+        Only a bounded window of batches is in flight at once, so memory use
+        stays proportional to ``batch_size * max_workers`` rather than the
+        size of the project.
+
+        Args:
+            project_name: Name of the ADO project
+            last_sync_time: If provided, fetch only items changed after this time (delta sync)
+            batch_size: Number of work items to fetch per batch
+            max_workers: Maximum number of batches fetched concurrently
+            progress_callback: Optional callback function(fetched, total) called after each batch
+
+        Yields:
+            Tuples of (content for embedding, work item metadata dictionary)
+        """
         logger.info(f"Fetching work items from project: {project_name}")
 
         # Build WIQL query
         if last_sync_time:
-            # Delta sync - fetch only changed items
-            # Azure DevOps WIQL requires date-only format (no time component)
-            changed_date_str = last_sync_time.strftime("%Y-%m-%d")
+            # Delta sync - fetch only items changed after the last sync
+            # Full timestamps require the query to run with time precision enabled
+            if last_sync_time.tzinfo is None:
+                last_sync_time = last_sync_time.replace(tzinfo=timezone.utc)
+            changed_date_str = (
+                last_sync_time.astimezone(timezone.utc)
+                .isoformat(timespec="milliseconds")
+                .replace("+00:00", "Z")
+            )
             wiql_query = f"""
                 SELECT [System.Id]
                 FROM WorkItems
                 WHERE [System.TeamProject] = '{project_name}'
-                AND [System.ChangedDate] >= '{changed_date_str}'
+                AND [System.ChangedDate] > '{changed_date_str}'
                 ORDER BY [System.ChangedDate] DESC
             """
             logger.info(f"Delta sync from: {changed_date_str}")
@@ -74,53 +181,105 @@ class ADOConnector:
 
         # Execute query
         wiql_query_obj = {"query": wiql_query}
-        query_result = self.wit_client.query_by_wiql(wiql_query_obj)
+        query_result = self.wit_client.query_by_wiql(
+            wiql_query_obj, time_precision=last_sync_time is not None
+        )
 
         if not query_result.work_items:
             logger.info("No work items found")
-            return []
+            return
 
         work_item_ids = [item.id for item in query_result.work_items]
-        logger.info(f"Found {len(work_item_ids)} work items")
+        total_ids = len(work_item_ids)
+        logger.info(f"Found {total_ids} work items")
+
+        # Fetch work items in concurrent batches, keeping at most max_workers in flight
+        id_batches = (
+            work_item_ids[i:i + batch_size] for i in range(0, total_ids, batch_size)
+        )
+        fetched_count = 0
+        yielded_count = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {
+                executor.submit(self._get_work_items_with_retry, batch_ids)
+                for batch_ids in itertools.islice(id_batches, max_workers)
+            }
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    batch_items = future.result()
+
+                    next_batch_ids = next(id_batches, None)
+                    if next_batch_ids:
+                        pending.add(
+                            executor.submit(self._get_work_items_with_retry, next_batch_ids)
+                        )
+
+                    fetched_count += len(batch_items)
+                    logger.info(f"Fetched {fetched_count}/{total_ids} work items")
+                    if progress_callback:
+                        progress_callback(fetched_count, total_ids)
+
+                    for work_item in self._extract_batch(batch_items, project_name):
+                        yielded_count += 1
+                        yield work_item
+
+        logger.info(f"Total work items fetched: {yielded_count}")
+
+    def _get_work_items_with_retry(
+        self,
+        ids: List[int],
+        max_attempts: int = 5,
+        base: float = 1.0,
+        cap: float = 30.0,
+    ) -> List[Any]:
+        """
+        Fetch a batch of work items, retrying throttled or transient failures.
 
-        # Fetch work items in batches
-        work_items = []
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            batch_items = self.wit_client.get_work_items(
-                ids=batch_ids,
-                expand="All",  # Include all fields and relations
-            )
+        Args:
+            ids: Work item IDs to fetch
+            max_attempts: Maximum number of attempts before giving up
+            base: Base delay in seconds for exponential backoff
+            cap: Maximum delay in seconds
 
-            for item in batch_items:
-                # Filter items if doing delta sync to only include items changed after last_sync_time
-                if last_sync_time:
-                    changed_date = item.fields.get("System.ChangedDate")
-                    if changed_date:
-                        # Parse if string
-                        if isinstance(changed_date, str):
-                            from dateutil import parser
-                            changed_date = parser.parse(changed_date)
-                        
-                        # Ensure timezone-aware comparison
-                        from datetime import timezone
-                        if changed_date.tzinfo is None:
-                            changed_date = changed_date.replace(tzinfo=timezone.utc)
-                        if last_sync_time.tzinfo is None:
-                            last_sync_time = last_sync_time.replace(tzinfo=timezone.utc)
-                        
-                        # Only include if changed after last sync time
-                        if changed_date <= last_sync_time:
-                            continue
-                
-                work_items.append(self._extract_work_item_data(item, project_name))
-
-            logger.info(f"Processed batch {i // batch_size + 1}: {len(batch_items)} items")
-
-        logger.info(f"Total work items fetched: {len(work_items)}")
-        return work_items
+        Returns:
+            List of work item objects from the Azure DevOps API
+        """
+        for attempt in range(max_attempts):
+            try:
+                return self.wit_client.get_work_items(
+                    ids=ids,
+                    expand="Fields",  # Relations and links are not used downstream
+                )
+            except (ClientRequestError, HttpOperationError) as e:
+                if not _is_retryable(e) or attempt == max_attempts - 1:
+                    raise
+                delay = min(cap, base * 2 ** attempt) + random.random() * 0.25
+                logger.warning(
+                    f"Transient error from Azure DevOps (attempt {attempt + 1}/{max_attempts}), "
+                    f"retrying in {delay:.1f}s: {e}"
+                )
+                time.sleep(delay)
+
+    def _extract_batch(
+        self, batch_items: List[Any], project_name: str
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Extract work item data for one fetched batch.
+
+        Args:
+            batch_items: Work item objects from the Azure DevOps API
+            project_name: Name of the project
+
+        Returns:
+            List of (content, metadata) tuples as returned by _extract_work_item_data
+        """
+        return [self._extract_work_item_data(item, project_name) for item in batch_items]
     
-    def get_all_work_item_ids(self, project_name: str) -> set:
+    def get_all_work_item_ids(self, project_name: str) -> FrozenSet[int]:
         """
         Get all work item IDs from Azure DevOps project (without fetching full details).
         
@@ -128,94 +287,86 @@ class ADOConnector:
             project_name: Name of the ADO project
             
         Returns:
-            Set of work item IDs as strings
+            Frozen set of work item IDs as integers
         """
         logger.info(f"Fetching all work item IDs from project: {project_name}")
         
-        wiql_query = f"""
-            SELECT [System.Id]
-            FROM WorkItems
-            WHERE [System.TeamProject] = '{project_name}'
-        """
-        
-        wiql_query_obj = {"query": wiql_query}
+        wiql_query_obj = {"query": self.ALL_IDS_WIQL.format(project_name=project_name)}
         query_result = self.wit_client.query_by_wiql(wiql_query_obj)
         
         if not query_result.work_items:
             logger.info("No work items found")
-            return set()
+            return frozenset()
         
-        work_item_ids = set(str(item.id) for item in query_result.work_items)
+        work_item_ids = frozenset(item.id for item in query_result.work_items)
         logger.info(f"Found {len(work_item_ids)} work item IDs in Azure DevOps")
         return work_item_ids
 
-    def _extract_work_item_data(self, work_item: Any, project_name: str) -> Dict[str, Any]:
+    def _extract_work_item_data(
+        self, work_item: Any, project_name: str
+    ) -> Tuple[str, Dict[str, Any]]:
         """
         Extract and clean work item data.
 
+        The embedding content is returned separately from the metadata so that
+        callers can batch contents as a flat list of strings.
+
         Args:
             work_item: Work item object from Azure DevOps API
             project_name: Name of the project
 
         Returns:
-            Dictionary with extracted work item metadata
+            Tuple of (content for embedding, dictionary with extracted work item metadata)
         """
         fields = work_item.fields
 
-        # Extract basic fields
+        # Extract all fields in one pass
         work_item_id = str(work_item.id)
-        title = fields.get("System.Title", "")
-        description = self._clean_html(fields.get("System.Description", ""))
-        work_item_type = fields.get("System.WorkItemType", "")
-        state = fields.get("System.State", "")
-        assigned_to = fields.get("System.AssignedTo", {}).get("displayName", "") if isinstance(
-            fields.get("System.AssignedTo"), dict
-        ) else str(fields.get("System.AssignedTo", ""))
-        tags = fields.get("System.Tags", "")
-        created_date = fields.get("System.CreatedDate")
-        changed_date = fields.get("System.ChangedDate")
-        
-        # Extract additional fields
-        acceptance_criteria = self._clean_html(fields.get("Microsoft.VSTS.Common.AcceptanceCriteria", ""))
-        repro_steps = self._clean_html(fields.get("Microsoft.VSTS.TCM.ReproSteps", ""))
-        priority = fields.get("Microsoft.VSTS.Common.Priority", "")
-        severity = fields.get("Microsoft.VSTS.Common.Severity", "")
+        (
+            title,
+            description,
+            work_item_type,
+            state,
+            assigned_to,
+            tags,
+            created_date,
+            changed_date,
+            acceptance_criteria,
+            repro_steps,
+            priority,
+            severity,
+        ) = [fields.get(key, default) for key, default in _WORK_ITEM_FIELDS]
+
+        # AssignedTo is an identity dict from the API, but may be a plain string
+        if isinstance(assigned_to, dict):
+            assigned_to = assigned_to.get("displayName", "")
+        else:
+            assigned_to = str(assigned_to) if assigned_to else ""
+
+        description = self._clean_html(description)
+        acceptance_criteria = self._clean_html(acceptance_criteria)
+        repro_steps = self._clean_html(repro_steps)
 
         # Extract comments from history
         comments = self._extract_comments(work_item)
 
         # Build content for embedding (combine all searchable text)
-        content_parts = [
+        optional_parts = (
+            ("Description", description),
+            ("Acceptance Criteria", acceptance_criteria),
+            ("Repro Steps", repro_steps),
+            ("Tags", tags),
+            ("Priority", priority),
+            ("Severity", severity),
+            ("Assigned To", assigned_to),
+            ("Comments", comments),
+        )
+        content = "\n\n".join([
             f"Title: {title}",
             f"Type: {work_item_type}",
             f"State: {state}",
-        ]
-
-        if description:
-            content_parts.append(f"Description: {description}")
-        
-        if acceptance_criteria:
-            content_parts.append(f"Acceptance Criteria: {acceptance_criteria}")
-        
-        if repro_steps:
-            content_parts.append(f"Repro Steps: {repro_steps}")
-
-        if tags:
-            content_parts.append(f"Tags: {tags}")
-        
-        if priority:
-            content_parts.append(f"Priority: {priority}")
-        
-        if severity:
-            content_parts.append(f"Severity: {severity}")
-
-        if assigned_to:
-            content_parts.append(f"Assigned To: {assigned_to}")
-
-        if comments:
-            content_parts.append(f"Comments: {comments}")
-
-        content = "\n\n".join(content_parts)
+            *[f"{label}: {value}" for label, value in optional_parts if value],
+        ])
 
         # Build work item URL
         work_item_url = f"{self.organization_url}/{project_name}/_workitems/edit/{work_item_id}"
@@ -226,7 +377,7 @@ class ADOConnector:
         if changed_date and hasattr(changed_date, 'isoformat'):
             changed_date = changed_date.isoformat()
 
-        return {
+        return content, {
             "id": f"{project_name}_{work_item_id}",
             "work_item_id": work_item_id,
             "title": title,
@@ -239,7 +390,6 @@ class ADOConnector:
             "work_item_url": work_item_url,
             "created_date": created_date,
             "changed_date": changed_date,
-            "content": content,
             "is_metadata": False,
         }
 
@@ -282,19 +432,21 @@ class ADOConnector:
         if not html_text:
             return ""
 
-        try:
-            from bs4 import BeautifulSoup
+        # Plain-text fields have no markup or entities to strip
+        if "<" not in html_text and "&" not in html_text:
+            return html_text.strip()
+
+        if HTMLParser is None:
+            return _WS_RE.sub(" ", _TAG_RE.sub(" ", html_text)).strip()
 
-            soup = BeautifulSoup(html_text, "lxml")
-            text = soup.get_text(separator=" ", strip=True)
-            return text
+        try:
+            tree = HTMLParser(html_text)
+            root = tree.body if tree.body is not None else tree.root
+            return root.text(separator=" ", strip=True) if root is not None else ""
         except Exception as e:
             logger.warning(f"Error cleaning HTML: {e}")
             # Fallback: simple tag removal
-            import re
-            text = re.sub(r"<[^>]+>", " ", html_text)
-            text = re.sub(r"\s+", " ", text).strip()
-            return text
+            return _WS_RE.sub(" ", _TAG_RE.sub(" ", html_text)).strip()
 
     def test_connection(self, project_name: str) -> bool:
         """
@@ -1,13 +1,134 @@
 """Azure OpenAI embedding service for generating embeddings."""
 
+import asyncio
+import functools
 import logging
-from typing import List
+import random
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import tiktoken
-from openai import AzureOpenAI
+from openai import APIStatusError, AsyncAzureOpenAI, AzureOpenAI, RateLimitError
 
 logger = logging.getLogger(__name__)
 
+# HTTP status codes that indicate a transient failure worth retrying
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    """
+    Load a tiktoken encoding once per process.
+
+    Args:
+        encoding_name: Name of the tiktoken encoding (e.g., 'cl100k_base')
+
+    Returns:
+        Cached tiktoken encoding
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+
+def _backoff_delay(
+    error: Exception, attempt: int, base: float, cap: float
+) -> Optional[float]:
+    """
+    Compute how long to wait before retrying a failed API call.
+
+    Args:
+        error: Exception raised by the API call
+        attempt: Zero-based attempt number that just failed
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Delay in seconds, or None if the error is not retryable
+    """
+    if isinstance(error, RateLimitError):
+        status_code = 429
+    elif isinstance(error, APIStatusError):
+        status_code = error.status_code
+    else:
+        return None
+
+    if status_code not in _RETRYABLE_STATUS_CODES:
+        return None
+
+    # Honor the server's Retry-After hint when present
+    retry_after = error.response.headers.get("Retry-After") if error.response else None
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+
+    # Exponential backoff with jitter
+    return min(cap, base * 2 ** attempt) + random.random() * 0.25
+
+
+def _retry_with_backoff(
+    fn: Callable[[], Any], max_attempts: int = 5, base: float = 1.0, cap: float = 30.0
+) -> Any:
+    """
+    Call fn, retrying transient 429/5xx errors with exponential backoff.
+
+    Args:
+        fn: Zero-argument callable performing the API request
+        max_attempts: Maximum number of attempts before giving up
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Result of fn
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except Exception as e:
+            delay = _backoff_delay(e, attempt, base, cap)
+            if delay is None or attempt == max_attempts - 1:
+                raise
+            logger.warning(
+                f"Transient error from embeddings API (attempt {attempt + 1}/{max_attempts}), "
+                f"retrying in {delay:.1f}s: {e}"
+            )
+            time.sleep(delay)
+
+
+async def _aretry_with_backoff(
+    fn: Callable[[], Awaitable[Any]],
+    max_attempts: int = 5,
+    base: float = 1.0,
+    cap: float = 30.0,
+) -> Any:
+    """
+    Async variant of _retry_with_backoff for coroutine-returning callables.
+
+    Args:
+        fn: Zero-argument callable returning an awaitable API request
+        max_attempts: Maximum number of attempts before giving up
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Result of the awaited fn
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await fn()
+        except Exception as e:
+            delay = _backoff_delay(e, attempt, base, cap)
+            if delay is None or attempt == max_attempts - 1:
+                raise
+            logger.warning(
+                f"Transient error from embeddings API (attempt {attempt + 1}/{max_attempts}), "
+                f"retrying in {delay:.1f}s: {e}"
+            )
+            await asyncio.sleep(delay)
+
 
 class EmbeddingService:
     """Service for generating embeddings using Azure OpenAI."""
@@ -19,6 +140,8 @@ class EmbeddingService:
         api_version: str,
         deployment_name: str,
         max_tokens: int = 8191,
+        max_batch_tokens: int = 200_000,
+        client: Optional[AzureOpenAI] = None,
     ):
         """
         Initialize Embedding Service.
@@ -28,18 +151,58 @@ class EmbeddingService:
             api_key: Azure OpenAI API key
             api_version: API version (e.g., '2024-02-15-preview')
             deployment_name: Name of the embedding model deployment
-            max_tokens: Maximum tokens per request (default: 8191 for text-embedding-3-small)
+            max_tokens: Maximum tokens per input text (default: 8191 for text-embedding-3-small)
+            max_batch_tokens: Maximum cumulative tokens packed into a single batch request
+            client: Existing Azure OpenAI client to share instead of creating one
         """
-        self.client = AzureOpenAI(
+        self.client = client or AzureOpenAI(
             azure_endpoint=endpoint,
             api_key=api_key,
             api_version=api_version,
         )
+        self._client_kwargs = {
+            "azure_endpoint": endpoint,
+            "api_key": api_key,
+            "api_version": api_version,
+        }
+        # One async client per event loop; the sync pipeline and the RAG loop share this service
+        self._aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAzureOpenAI]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._aclients_lock = threading.Lock()
         self.deployment_name = deployment_name
         self.max_tokens = max_tokens
+        self.max_batch_tokens = max_batch_tokens
 
         # Initialize tokenizer for text-embedding-3-small (uses cl100k_base encoding)
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = _get_encoding("cl100k_base")
+
+    @property
+    def aclient(self) -> AsyncAzureOpenAI:
+        """
+        Async client bound to the running event loop.
+
+        Pooled connections cannot be shared across event loops, so each loop
+        gets its own client, reused for as long as that loop is alive.
+
+        Returns:
+            AsyncAzureOpenAI client for the current loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._aclients_lock:
+            client = self._aclients.get(loop)
+            if client is None:
+                client = AsyncAzureOpenAI(**self._client_kwargs)
+                self._aclients[loop] = client
+            return client
+
+    async def aclose(self) -> None:
+        """Close the async client of the running event loop, if one was created."""
+        loop = asyncio.get_running_loop()
+        with self._aclients_lock:
+            client = self._aclients.pop(loop, None)
+        if client is not None:
+            await client.close()
 
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -59,9 +222,43 @@ class EmbeddingService:
         text = self._truncate_text(text)
 
         try:
-            response = self.client.embeddings.create(
-                input=text,
-                model=self.deployment_name,
+            response = _retry_with_backoff(
+                lambda: self.client.embeddings.create(
+                    input=text,
+                    model=self.deployment_name,
+                )
+            )
+            embedding = response.data[0].embedding
+            logger.debug(f"Generated embedding of dimension {len(embedding)}")
+            return embedding
+
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            raise
+
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """
+        Generate embedding for a single text using the async client.
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            Embedding vector as list of floats
+        """
+        if not text or not text.strip():
+            logger.warning("Empty text provided for embedding")
+            return [0.0] * 1536  # Return zero vector for empty text
+
+        # Truncate text if it exceeds max tokens
+        text = self._truncate_text(text)
+
+        try:
+            response = await _aretry_with_backoff(
+                lambda: self.aclient.embeddings.create(
+                    input=text,
+                    model=self.deployment_name,
+                )
             )
             embedding = response.data[0].embedding
             logger.debug(f"Generated embedding of dimension {len(embedding)}")
@@ -72,14 +269,14 @@ class EmbeddingService:
             raise
 
     def generate_embeddings_batch(
-        self, texts: List[str], batch_size: int = 16
+        self, texts: List[str], batch_size: int = 256
     ) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batches.
 
         Args:
             texts: List of input texts
-            batch_size: Number of texts to process per API call
+            batch_size: Maximum number of texts to process per API call
 
         Returns:
             List of embedding vectors
@@ -87,34 +284,162 @@ class EmbeddingService:
         if not texts:
             return []
 
+        unique_texts, index_map = self._dedupe_texts(texts)
         embeddings = []
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-
-            # Truncate texts in batch
-            batch = [self._truncate_text(text) for text in batch]
-
+        for batch_number, batch in enumerate(self._pack_batches(unique_texts, batch_size), 1):
             try:
-                response = self.client.embeddings.create(
-                    input=batch,
-                    model=self.deployment_name,
+                response = _retry_with_backoff(
+                    lambda: self.client.embeddings.create(
+                        input=batch,
+                        model=self.deployment_name,
+                    )
                 )
 
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
+            except Exception as e:
+                # Raise instead of padding with zero vectors so callers never index bad data
+                logger.error(f"Error generating embeddings for batch {batch_number}: {e}")
+                raise
+
+            batch_embeddings = [item.embedding for item in response.data]
+            embeddings.extend(batch_embeddings)
+
+            logger.info(
+                f"Generated embeddings for batch {batch_number}: "
+                f"{len(batch_embeddings)} embeddings"
+            )
+
+        return [embeddings[i] for i in index_map]
 
-                logger.info(
-                    f"Generated embeddings for batch {i // batch_size + 1}: "
-                    f"{len(batch_embeddings)} embeddings"
+    async def agenerate_embeddings_batch(
+        self, texts: List[str], batch_size: int = 256, max_concurrency: int = 8
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for multiple texts with concurrent API calls.
+
+        Batches are dispatched together and bounded by a semaphore so that
+        at most ``max_concurrency`` requests are in flight at once.
+
+        Args:
+            texts: List of input texts
+            batch_size: Maximum number of texts to process per API call
+            max_concurrency: Maximum number of concurrent API calls
+
+        Returns:
+            List of embedding vectors, in the same order as ``texts``
+        """
+        if not texts:
+            return []
+
+        unique_texts, index_map = self._dedupe_texts(texts)
+        chunks = self._pack_batches(unique_texts, batch_size)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        results = await asyncio.gather(
+            *[self._embed_one(chunk, semaphore) for chunk in chunks]
+        )
+
+        # gather preserves submission order, so batches concatenate in input order
+        embeddings = [embedding for batch_embeddings in results for embedding in batch_embeddings]
+
+        logger.info(
+            f"Generated {len(embeddings)} embeddings in {len(chunks)} concurrent batches"
+        )
+        return [embeddings[i] for i in index_map]
+
+    async def _embed_one(
+        self, batch: List[str], semaphore: asyncio.Semaphore
+    ) -> List[List[float]]:
+        """
+        Embed a single batch using the async client.
+
+        Args:
+            batch: Truncated input texts for one API call
+            semaphore: Semaphore bounding concurrent requests
+
+        Returns:
+            List of embedding vectors for the batch
+        """
+        async with semaphore:
+            try:
+                response = await _aretry_with_backoff(
+                    lambda: self.aclient.embeddings.create(
+                        input=batch,
+                        model=self.deployment_name,
+                    )
                 )
+                return [item.embedding for item in response.data]
 
             except Exception as e:
+                # Raise instead of padding with zero vectors so callers never index bad data
                 logger.error(f"Error generating embeddings for batch: {e}")
-                # Add zero vectors for failed batch
-                embeddings.extend([[0.0] * 1536] * len(batch))
+                raise
+
+    def _dedupe_texts(self, texts: List[str]) -> Tuple[List[str], List[int]]:
+        """
+        Collapse identical texts so each distinct input is embedded once.
+
+        Args:
+            texts: List of input texts
 
-        return embeddings
+        Returns:
+            Tuple of (unique texts in first-seen order, index into the unique
+            texts for each original position)
+        """
+        seen: Dict[str, int] = {}
+        unique_texts: List[str] = []
+        index_map: List[int] = []
+
+        for text in texts:
+            index = seen.get(text)
+            if index is None:
+                index = seen[text] = len(unique_texts)
+                unique_texts.append(text)
+            index_map.append(index)
+
+        if len(unique_texts) < len(texts):
+            logger.info(
+                f"Deduplicated {len(texts) - len(unique_texts)} of {len(texts)} embedding inputs"
+            )
+
+        return unique_texts, index_map
+
+    def _pack_batches(self, texts: List[str], batch_size: int) -> List[List[str]]:
+        """
+        Truncate texts and pack them into batches bounded by count and tokens.
+
+        A batch is closed when it reaches ``batch_size`` inputs or when adding
+        the next text would exceed ``max_batch_tokens``, whichever comes first.
+
+        Args:
+            texts: List of input texts
+            batch_size: Maximum number of texts per batch
+
+        Returns:
+            List of batches of truncated texts
+        """
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+
+        for text in texts:
+            text, text_tokens = self._truncate_and_count(text)
+
+            if batch and (
+                len(batch) >= batch_size
+                or batch_tokens + text_tokens > self.max_batch_tokens
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+
+            batch.append(text)
+            batch_tokens += text_tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
 
     def _truncate_text(self, text: str) -> str:
         """
@@ -129,10 +454,29 @@ class EmbeddingService:
         if not text:
             return ""
 
-        tokens = self.tokenizer.encode(text)
+        # Every token covers at least one UTF-8 byte, so short texts cannot exceed the limit
+        if len(text.encode("utf-8")) <= self.max_tokens:
+            return text
+
+        return self._truncate_and_count(text)[0]
+
+    def _truncate_and_count(self, text: str) -> Tuple[str, int]:
+        """
+        Truncate text to fit within max token limit and report its token count.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Tuple of (truncated text, number of tokens in the truncated text)
+        """
+        if not text:
+            return "", 0
+
+        tokens = self.tokenizer.encode_ordinary(text)
 
         if len(tokens) <= self.max_tokens:
-            return text
+            return text, len(tokens)
 
         # Truncate tokens and decode back to text
         truncated_tokens = tokens[:self.max_tokens]
@@ -142,7 +486,7 @@ class EmbeddingService:
             f"Text truncated from {len(tokens)} to {self.max_tokens} tokens"
         )
 
-        return truncated_text
+        return truncated_text, self.max_tokens
 
     def count_tokens(self, text: str) -> int:
         """
@@ -157,5 +501,5 @@ class EmbeddingService:
         if not text:
             return 0
 
-        tokens = self.tokenizer.encode(text)
+        tokens = self.tokenizer.encode_ordinary(text)
         return len(tokens)
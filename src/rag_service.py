@@ -1,16 +1,403 @@
 """RAG service for querying and generating responses using Azure OpenAI."""
 
+import asyncio
+import functools
+import json
 import logging
 import re
-from typing import Dict, Generator, List, Optional
+import threading
+from collections import ChainMap, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, List, Optional, Tuple
 
-from openai import AzureOpenAI
+import numpy as np
+from openai import AsyncAzureOpenAI
 
 from .embedding_service import EmbeddingService
 from .search_service import SearchIndexManager
 
+# Try to use orjson for decoding streamed events; fall back to the stdlib parser without it
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Work item type terms, matched as whole words, in precedence order
+_WORK_ITEM_TYPE_TERMS = {
+    'bug': 'Bug',
+    'bugs': 'Bug',
+    'issue': 'Bug',
+    'issues': 'Bug',
+    'defect': 'Bug',
+    'defects': 'Bug',
+    'user story': 'User Story',
+    'user stories': 'User Story',
+    'story': 'User Story',
+    'stories': 'User Story',
+    'task': 'Task',
+    'tasks': 'Task',
+    'epic': 'Epic',
+    'epics': 'Epic',
+    'feature': 'Feature',
+    'features': 'Feature',
+}
+_WORK_ITEM_TYPE_PRECEDENCE = list(dict.fromkeys(_WORK_ITEM_TYPE_TERMS.values()))
+_TYPE_PATTERN = re.compile(
+    r'\b(bugs?|issues?|defects?|user stor(?:y|ies)|stor(?:y|ies)|tasks?|epics?|features?)\b'
+)
+
+# Phrases that indicate a count or list query
+_COUNT_PATTERN = re.compile(r'how many|count|number of|list all|show all|give me all|total')
+
+# Phrases that indicate the user wants to see items rather than just a count
+_WANTS_LIST_PATTERN = re.compile(r'list|show|display|what are|which')
+
+# Work item ID references like: #123, #61, WI-123, work item 123, item #123;
+# exactly one group participates in each match
+_WORK_ITEM_ID_PATTERN = re.compile(
+    r'#(\d+)'  # #123
+    r'|WI-(\d+)'  # WI-123
+    r'|work\s*item\s*#?(\d+)'  # work item 123 or work item #123
+    r'|item\s*#?(\d+)',  # item 123 or item #123
+    re.IGNORECASE,
+)
+
+# Filter phrases mapped to OData filters; earlier phrases win when several match
+_STATE_TERMS = {
+    'closed': "state eq 'Closed'",
+    'resolved': "state eq 'Resolved'",
+    'completed': "state eq 'Closed'",
+    'done': "state eq 'Closed'",
+    'active': "state eq 'Active'",
+    'open': "state eq 'Active'",
+    'in progress': "state eq 'Active'",
+    'new': "state eq 'New'",
+}
+_PRIORITY_TERMS = {
+    'priority 1': "priority eq '1'",
+    'p1': "priority eq '1'",
+    'highest priority': "priority eq '1'",
+    'priority 2': "priority eq '2'",
+    'p2': "priority eq '2'",
+    'high priority': "priority eq '2'",
+    'priority 3': "priority eq '3'",
+    'p3': "priority eq '3'",
+    'medium priority': "priority eq '3'",
+    'priority 4': "priority eq '4'",
+    'p4': "priority eq '4'",
+    'low priority': "priority eq '4'",
+}
+_SEVERITY_TERMS = {
+    'critical': "severity eq '1 - Critical'",
+    'severity 1': "severity eq '1 - Critical'",
+    'high severity': "severity eq '2 - High'",
+    'severity 2': "severity eq '2 - High'",
+    'medium severity': "severity eq '3 - Medium'",
+    'severity 3': "severity eq '3 - Medium'",
+    'low severity': "severity eq '4 - Low'",
+    'severity 4': "severity eq '4 - Low'",
+}
+
+# Phrases that indicate a bug triage/similarity query
+_TRIAGE_PHRASES = (
+    'similar bug', 'duplicate bug', 'same bug', 'related bug',
+    'already logged', 'already reported', 'already exists',
+    'valid bug', 'is this a bug', 'triage', 'related requirement',
+    'match with requirement', 'associated requirement', 'check for duplicate'
+)
+_TRIAGE_PATTERN = re.compile('|'.join(re.escape(phrase) for phrase in _TRIAGE_PHRASES))
+
+# Simple greetings
+_GREETINGS = (
+    "hi", "hello", "hey", "greetings", "good morning", "good afternoon",
+    "good evening", "howdy", "hiya", "sup", "what's up", "whats up"
+)
+
+# Conversational phrases that don't need work item search
+_CONVERSATIONAL = (
+    "how are you", "thank you", "thanks", "bye", "goodbye", "ok", "okay",
+    "nice", "cool", "great", "awesome", "perfect"
+)
+
+_GREETING_OR_CONVERSATIONAL = frozenset(_GREETINGS + _CONVERSATIONAL)
+
+# A greeting followed by a space or "!" at the start of the text
+_GREETING_PREFIX_PATTERN = re.compile(
+    '(?:' + '|'.join(re.escape(greeting) for greeting in _GREETINGS) + ')[ !]'
+)
+
+# Keywords that turn a greeting into a work item question
+_QUESTION_KEYWORD_PATTERN = re.compile(
+    'show|find|search|get|list|what|how|which|when|who|bug|issue|task|work item'
+)
+
+# Substrings selecting the canned conversational responses
+_HELLO_PATTERN = re.compile('hi|hello|hey|good morning|good afternoon|good evening')
+_BYE_PATTERN = re.compile('bye|goodbye')
+
+
+def _extract_ids(text: str) -> Tuple[str, ...]:
+    """
+    Extract the unique work item IDs referenced in text, in order of appearance.
+
+    Args:
+        text: Text to search for work item IDs
+
+    Returns:
+        Tuple of work item IDs
+    """
+    # The pattern ignores case, so lowercasing only makes callers share cache entries
+    return _scan_ids(text.lower())
+
+
+@functools.lru_cache(maxsize=64)
+def _scan_ids(text: str) -> Tuple[str, ...]:
+    """Scan lowercased text for work item IDs; memoized for _extract_ids."""
+    return tuple(dict.fromkeys(
+        match.group(match.lastindex) for match in _WORK_ITEM_ID_PATTERN.finditer(text)
+    ))
+
+
+def _compile_phrase_scanner(terms: Dict[str, str]) -> Tuple["re.Pattern", Dict[str, int]]:
+    """
+    Compile a single-pass scanner that finds every (possibly overlapping) phrase.
+
+    Args:
+        terms: Mapping of phrase to value, in precedence order
+
+    Returns:
+        Tuple of (compiled pattern, phrase -> precedence rank)
+    """
+    # A lookahead group matches at every position, so overlapping phrases are all found
+    pattern = re.compile("(?=(" + "|".join(re.escape(term) for term in terms) + "))")
+    return pattern, {term: rank for rank, term in enumerate(terms)}
+
+
+def _first_phrase_value(
+    scanner: Tuple["re.Pattern", Dict[str, int]], terms: Dict[str, str], text: str
+) -> Optional[str]:
+    """
+    Return the value of the highest-precedence phrase found in text.
+
+    Args:
+        scanner: Result of _compile_phrase_scanner for terms
+        terms: Mapping of phrase to value, in precedence order
+        text: Lowercased text to scan
+
+    Returns:
+        Mapped value, or None if no phrase occurs in text
+    """
+    pattern, ranks = scanner
+    matches = pattern.findall(text)
+    if not matches:
+        return None
+    return terms[min(matches, key=ranks.__getitem__)]
+
+
+_STATE_SCANNER = _compile_phrase_scanner(_STATE_TERMS)
+_PRIORITY_SCANNER = _compile_phrase_scanner(_PRIORITY_TERMS)
+_SEVERITY_SCANNER = _compile_phrase_scanner(_SEVERITY_TERMS)
+
+
+# Markdown reference line per work item, with defaults for missing fields
+_REFERENCE_TEMPLATE = "- [#{work_item_id}]({work_item_url}) - **{title}** ({work_item_type} - {state})"
+_REFERENCE_DEFAULTS = {
+    "work_item_id": "Unknown",
+    "title": "No title",
+    "work_item_type": "Unknown",
+    "state": "Unknown",
+    "work_item_url": "#",
+}
+
+
+def _sse_content(line: str) -> Optional[str]:
+    """
+    Extract the delta content from one raw chat completion server-sent event line.
+
+    Args:
+        line: Line of the SSE response body
+
+    Returns:
+        Non-empty content fragment, or None for events without content
+    """
+    if not line.startswith("data: "):
+        return None
+    data = line[6:]
+    if data == "[DONE]":
+        return None
+
+    event = _json_loads(data)
+    if "error" in event:
+        raise RuntimeError(event["error"].get("message", "Streaming error"))
+
+    choices = event.get("choices")
+    if choices:
+        return (choices[0].get("delta") or {}).get("content") or None
+    return None
+
+
+def _sort_by_work_item_id(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sort documents by numeric work item ID, parsing each ID exactly once.
+
+    Args:
+        documents: Retrieved documents
+
+    Returns:
+        New list of the documents in ascending work item ID order
+    """
+    keyed = [(int(doc.get("work_item_id", "0")), i, doc) for i, doc in enumerate(documents)]
+    keyed.sort()
+    return [doc for _, _, doc in keyed]
+
+
+@dataclass
+class QueryClass:
+    """Classification and filters extracted from a user question."""
+
+    is_greeting: bool
+    is_triage: bool
+    is_count: bool
+    wants_list: bool
+    wi_filter: Optional[str]
+    type_filter: Optional[str]
+    comp_filter: Optional[str]
+
+
+class _ProximityCache:
+    """
+    LRU cache of retrieval results keyed by query embedding similarity.
+
+    Exact repeats of a query skip both the embedding call and the search;
+    paraphrases whose embedding is within the cosine similarity threshold of a
+    cached query (under the same filter and top_k) skip the search.
+    """
+
+    def __init__(self, capacity: int = 256, threshold: float = 0.95):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity: Maximum number of cached queries
+            threshold: Minimum cosine similarity for an approximate hit
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.index_version: Optional[int] = None
+
+        # (question, filter_expr, top_k) -> (int8 embedding, its norm, documents)
+        self._entries: OrderedDict = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_norms: Optional[np.ndarray] = None
+        self._matrix_keys: List[Tuple[str, str, int]] = []
+
+    def sync_version(self, index_version: int) -> None:
+        """
+        Drop all entries if the search index has changed since they were cached.
+
+        Args:
+            index_version: Current SearchIndexManager.index_version
+        """
+        if index_version != self.index_version:
+            self._entries.clear()
+            self._matrix = None
+            self.index_version = index_version
+
+    def get_exact(
+        self, question: str, filter_expr: str, top_k: int
+    ) -> Optional[List[Dict]]:
+        """
+        Look up an exact repeat of a query.
+
+        Args:
+            question: Normalized query text
+            filter_expr: OData filter used for retrieval
+            top_k: Number of results requested
+
+        Returns:
+            Cached documents, or None on a miss
+        """
+        key = (question, filter_expr, top_k)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return list(entry[2])
+
+    def get_similar(
+        self, embedding: List[float], filter_expr: str, top_k: int
+    ) -> Optional[List[Dict]]:
+        """
+        Look up a cached query whose embedding is close to this one.
+
+        Args:
+            embedding: Query embedding
+            filter_expr: OData filter used for retrieval
+            top_k: Number of results requested
+
+        Returns:
+            Cached documents, or None on a miss
+        """
+        if not self._entries:
+            return None
+
+        query_vector, query_norm = self._quantize(embedding)
+        if not query_norm:
+            return None
+
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = np.stack([self._entries[key][0] for key in self._matrix_keys])
+            self._matrix_norms = np.array(
+                [self._entries[key][1] or 1.0 for key in self._matrix_keys], dtype=np.float32
+            )
+
+        # Cosine similarity from the int8 dot products, accumulated in int32
+        dots = np.matmul(self._matrix, query_vector, dtype=np.int32)
+        similarities = dots / (self._matrix_norms * query_norm)
+        for i in np.argsort(similarities)[::-1]:
+            if similarities[i] < self.threshold:
+                break
+            key = self._matrix_keys[i]
+            if key[1] == filter_expr and key[2] == top_k:
+                self._entries.move_to_end(key)
+                logger.debug(f"Approximate cache hit (similarity {similarities[i]:.3f})")
+                return list(self._entries[key][2])
+        return None
+
+    def put(
+        self, question: str, filter_expr: str, top_k: int,
+        embedding: List[float], documents: List[Dict],
+    ) -> None:
+        """
+        Cache the retrieval result for a query.
+
+        Args:
+            question: Normalized query text
+            filter_expr: OData filter used for retrieval
+            top_k: Number of results requested
+            embedding: Query embedding
+            documents: Retrieved documents
+        """
+        quantized, norm = self._quantize(embedding)
+        self._entries[(question, filter_expr, top_k)] = (quantized, norm, list(documents))
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    @staticmethod
+    def _quantize(embedding: List[float]) -> Tuple[np.ndarray, float]:
+        """Return the embedding scaled to int8 by its largest magnitude, and that vector's norm."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        peak = np.abs(vector).max() if vector.size else 0.0
+        if peak:
+            vector = vector * (127.0 / peak)
+        quantized = np.clip(np.round(vector), -128, 127).astype(np.int8)
+        return quantized, float(np.linalg.norm(quantized.astype(np.float32)))
+
 
 class RAGService:
     """Service for RAG-based query and response generation."""
@@ -35,14 +422,77 @@ class RAGService:
             embedding_service: Embedding service instance
             search_manager: Search index manager instance
         """
-        self.client = AzureOpenAI(
-            azure_endpoint=openai_endpoint,
-            api_key=openai_api_key,
-            api_version=openai_api_version,
-        )
+        self._client_kwargs = {
+            "azure_endpoint": openai_endpoint,
+            "api_key": openai_api_key,
+            "api_version": openai_api_version,
+        }
+        self._aclient: Optional[AsyncAzureOpenAI] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
         self.chat_deployment = chat_deployment_name
         self.embedding_service = embedding_service
         self.search_manager = search_manager
+        self._proxy_cache = _ProximityCache()
+        # Vector-only results score differently from hybrid ones, so they are cached apart
+        self._vector_cache = _ProximityCache()
+
+        # System messages are immutable, so build them once and reuse them per request
+        self._system_prompt = self._get_system_prompt()
+        self._system_message = {"role": "system", "content": self._system_prompt}
+        self._triage_system_message = {
+            "role": "system",
+            "content": "You are a bug triage specialist. Analyze bugs for duplicates, match them with requirements, and provide triage decisions based on the provided context.",
+        }
+
+        # Shared pool for running blocking search requests off the event loop
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-io")
+
+        # Background event loop that drives aquery() for synchronous callers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def aclient(self) -> AsyncAzureOpenAI:
+        """
+        Async client bound to the running event loop.
+
+        Returns:
+            AsyncAzureOpenAI client, recreated when the event loop changes
+        """
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = AsyncAzureOpenAI(**self._client_kwargs)
+            self._aclient_loop = loop
+        return self._aclient
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the background event loop, starting its thread on first use.
+
+        Returns:
+            Event loop running in a daemon thread
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="rag-loop", daemon=True
+                ).start()
+            return self._loop
+
+    async def _run_io(self, fn: Callable[..., Any], **kwargs: Any) -> Any:
+        """
+        Run a blocking call on the I/O pool without blocking the event loop.
+
+        Args:
+            fn: Blocking callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, functools.partial(fn, **kwargs))
 
     def query(
         self,
@@ -54,6 +504,38 @@ class RAGService:
         """
         Query the RAG system and generate streaming response.
 
+        Synchronous wrapper that drives aquery() on the background event loop.
+
+        Args:
+            question: User's question
+            top_k: Number of relevant work items to retrieve
+            temperature: Sampling temperature for response generation
+            stream: Whether to stream the response
+
+        Yields:
+            Response text chunks
+        """
+        loop = self._get_loop()
+        chunks = self.aquery(question, top_k, temperature, stream)
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(chunks.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(chunks.aclose(), loop).result()
+
+    async def aquery(
+        self,
+        question: str,
+        top_k: int = 5,
+        temperature: float = 0.7,
+        stream: bool = True,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Query the RAG system and generate streaming response asynchronously.
+
         Args:
             question: User's question
             top_k: Number of relevant work items to retrieve
@@ -65,35 +547,36 @@ class RAGService:
         """
         logger.info(f"Processing query: {question[:100]}...")
 
+        query_class = self._classify(question)
+
         # Check if query is a simple greeting or conversational
-        if self._is_greeting_or_conversational(question):
+        if query_class.is_greeting:
             yield self._get_conversational_response(question)
             return
         
         # Check if this is a bug triage/similarity query
-        if self._is_bug_triage_query(question):
-            for chunk in self._handle_bug_triage(question, temperature, stream):
+        if query_class.is_triage:
+            # Every triage path needs the question embedding, so compute it once here
+            try:
+                question_embedding = await self.embedding_service.agenerate_embedding(question)
+            except Exception as e:
+                logger.error(f"Error in bug triage: {e}")
+                yield f"Error analyzing bug: {str(e)}"
+                return
+
+            async for chunk in self._handle_bug_triage(
+                question, temperature, stream, question_embedding=question_embedding
+            ):
                 yield chunk
             return
 
-        # Check if user is asking about a specific work item number
-        work_item_filter = self._extract_work_item_filter(question)
-        
-        # Check if user is asking about a specific work item type
-        type_filter = self._extract_work_item_type_filter(question)
-        
-        # Extract additional filters (state, priority, severity)
-        comprehensive_filters = self._extract_comprehensive_filters(question)
-        
-        # Check if this is a count/list query to retrieve more results
-        is_count_query = self._is_count_or_list_query(question)
-        # Check if user wants to see the list of items or just the count
-        wants_list = any(word in question.lower() for word in ['list', 'show', 'display', 'what are', 'which'])
+        work_item_filter = query_class.wi_filter
+        type_filter = query_class.type_filter
+        comprehensive_filters = query_class.comp_filter
+        is_count_query = query_class.is_count
+        wants_list = query_class.wants_list
         search_top_k = 50 if is_count_query else top_k
 
-        # Generate embedding for the question
-        question_embedding = self.embedding_service.generate_embedding(question)
-
         # Build filter expression
         filter_expr = "is_metadata eq false or is_metadata eq null"
         if work_item_filter:
@@ -103,109 +586,135 @@ class RAGService:
         if comprehensive_filters:
             filter_expr = f"({filter_expr}) and ({comprehensive_filters})"
 
+        has_filter = bool(type_filter or work_item_filter or comprehensive_filters)
+
+        # Pure count queries with a hard filter only need the total, so skip
+        # the question embedding and hybrid search entirely
+        if is_count_query and has_filter and not wants_list:
+            actual_count = await self._run_io(
+                self.search_manager.get_filtered_count, filter_expr=filter_expr
+            )
+            logger.info(f"Actual count for count-only query: {actual_count}")
+
+            if not actual_count:
+                yield "I couldn't find any relevant work items matching your query. Please try:\n- Using different keywords\n- Being more specific\n- Asking about work items that exist in your project"
+                return
+
+            context_parts = [f"""===== ANSWER: {actual_count} =====
+The total count is {actual_count}. Provide this number as your complete answer.
+Do not list individual items unless the user asked to see them.
+=================="""]
+            async for chunk in self._generate_answer(question, context_parts, temperature, stream):
+                yield chunk
+            return
+
         # Retrieve relevant work items using hybrid search
-        relevant_docs = self.search_manager.hybrid_search(
-            query_text=question,
-            query_vector=question_embedding,
-            top_k=search_top_k,
-            filter_expr=filter_expr,
-        )
+        relevant_docs = await self._retrieve(question, filter_expr, search_top_k)
         
-        print(f"[DEBUG RAG] Hybrid search returned {len(relevant_docs)} results")
-        print(f"[DEBUG RAG] Filter: {filter_expr}")
+        logger.debug("Hybrid search returned %d results", len(relevant_docs))
+        logger.debug("Filter: %s", filter_expr)
         
         # Filter out weak matches - only keep results with decent relevance scores
         # Azure AI Search returns @search.score (higher = more relevant)
         RELEVANCE_THRESHOLD = 1.0  # Minimum score to be considered relevant
         
+        debug = logger.isEnabledFor(logging.DEBUG)
+
         if relevant_docs:
-            scores = [doc.get('@search.score', 0) for doc in relevant_docs]
-            print(f"[DEBUG RAG] Search scores: {scores[:5]}")
+            if debug:
+                logger.debug("Search scores: %s", [doc.get('@search.score', 0) for doc in relevant_docs[:5]])
             
             # Filter by relevance threshold
             relevant_docs = [doc for doc in relevant_docs if doc.get('@search.score', 0) >= RELEVANCE_THRESHOLD]
-            print(f"[DEBUG RAG] After relevance filtering: {len(relevant_docs)} results")
+            logger.debug("After relevance filtering: %d results", len(relevant_docs))
         
-        print(f"[DEBUG RAG] Work item types in results: {[d.get('work_item_type') for d in relevant_docs[:10]]}")
+        if debug:
+            logger.debug("Work item types in results: %s", [d.get('work_item_type') for d in relevant_docs[:10]])
 
         if not relevant_docs:
             yield "I couldn't find any relevant work items matching your query. Please try:\n- Using different keywords\n- Being more specific\n- Asking about work items that exist in your project"
             return
 
+        # Sort once by numeric work item ID for both the context and the references
+        relevant_docs = _sort_by_work_item_id(relevant_docs)
+
         # For count queries, get the actual total count from the index
         actual_count = None
-        print(f"[DEBUG] is_count_query={is_count_query}, type_filter={type_filter}, comprehensive_filters={comprehensive_filters}, work_item_filter={work_item_filter}")
-        if is_count_query and (type_filter or work_item_filter or comprehensive_filters):
-            print(f"[DEBUG] Calling get_filtered_count with filter: {filter_expr}")
-            actual_count = self.search_manager.get_filtered_count(filter_expr)
+        logger.debug(
+            "is_count_query=%s, type_filter=%s, comprehensive_filters=%s, work_item_filter=%s",
+            is_count_query, type_filter, comprehensive_filters, work_item_filter,
+        )
+        if is_count_query and has_filter:
+            actual_count = await self._run_io(
+                self.search_manager.get_filtered_count, filter_expr=filter_expr
+            )
             logger.info(f"Actual count for query: {actual_count}")
-            print(f"[DEBUG] actual_count={actual_count}")
-        else:
-            print(f"[DEBUG] NOT calling get_filtered_count")
 
-        # Build context based on whether user wants details or just count
-        if actual_count is not None and not wants_list:
-            # For simple count queries, just provide the number
-            context = f"""===== ANSWER: {actual_count} =====
-The total count is {actual_count}. Provide this number as your complete answer.
-Do not list individual items unless the user asked to see them.
-=================="""
-            print(f"[DEBUG] Count-only response: {actual_count}")
-        else:
-            # Build full context with work item details
-            context = self._build_context(relevant_docs)
-            
-            if actual_count is not None:
-                context = f"""===== ANSWER: {actual_count} =====
+        # Build full context with work item details; count-only queries returned above
+        context_parts = self._build_context(relevant_docs)
+
+        if actual_count is not None:
+            context_parts.insert(0, f"""===== ANSWER: {actual_count} =====
 The total count is {actual_count}. Use this number as your answer.
 Below are {len(relevant_docs)} sample items for reference.
-==================\n\n{context}"""
-                print(f"[DEBUG] Added count {actual_count} with {len(relevant_docs)} items")
-            else:
-                print(f"[DEBUG] Regular query with {len(relevant_docs)} items")
+==================\n\n""")
+            logger.debug("Added count %s with %d items", actual_count, len(relevant_docs))
+        else:
+            logger.debug("Regular query with %d items", len(relevant_docs))
         
         # Debug: Log the context being sent to AI
-        logger.info(f"Context being sent to AI (length: {len(context)} chars):\n{context[:500]}...")
+        context_length = sum(map(len, context_parts))
+        logger.info(f"Context being sent to AI (length: {context_length} chars):\n{context_parts[0][:500]}...")
 
-        # Build work item references
-        references = self._build_references(relevant_docs)
+        # Only append references if user wants to see the list
+        references = None
+        if wants_list or not is_count_query:
+            references = self._build_references(relevant_docs)
 
-        # Generate response
-        messages = [
-            {
-                "role": "system",
-                "content": self._get_system_prompt(),
-            },
-            {
-                "role": "user",
-                "content": f"""Context from Azure DevOps work items:
+        async for chunk in self._generate_answer(question, context_parts, temperature, stream, references):
+            yield chunk
 
-{context}
+    async def _generate_answer(
+        self,
+        question: str,
+        context_parts: List[str],
+        temperature: float,
+        stream: bool,
+        references: Optional[str] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Generate the chat completion for a question over the given context.
+
+        Args:
+            question: User's question
+            context_parts: Context fragments built from the retrieved work items
+            temperature: Sampling temperature for response generation
+            stream: Whether to stream the response
+            references: Optional references section appended after the answer
+
+        Yields:
+            Response text chunks
+        """
+        # Assemble the user message in one join so the context is copied only once
+        user_content = "".join([
+            "Context from Azure DevOps work items:\n\n",
+            *context_parts,
+            f"""
 
 Question: {question}
 
 Please provide a comprehensive answer based on the work items above. Include specific work item IDs when referencing information.""",
-            },
+        ])
+        messages = [
+            self._system_message,
+            {"role": "user", "content": user_content},
         ]
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.chat_deployment,
-                messages=messages,
-                temperature=temperature,
-                stream=stream,
-                max_tokens=1000,
-            )
-
-            if stream:
-                for chunk in response:
-                    if chunk.choices and chunk.choices[0].delta.content:
-                        yield chunk.choices[0].delta.content
-            else:
-                yield response.choices[0].message.content
+            async for chunk in self._complete(messages, temperature, stream, max_tokens=1000):
+                yield chunk
 
-            # Only append references if user wants to see the list
-            if wants_list or not is_count_query:
+            if references is not None:
                 yield "\n\n---\n\n**Relevant Work Items:**\n\n"
                 yield references
 
@@ -213,6 +722,148 @@ Please provide a comprehensive answer based on the work items above. Include spe
             logger.error(f"Error generating response: {e}")
             yield f"\n\nError generating response: {str(e)}"
 
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        stream: bool,
+        max_tokens: int,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Run a chat completion and yield its text.
+
+        Streaming responses are read as raw server-sent events and only the
+        delta content is decoded, instead of building a model object per token.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            stream: Whether to stream the response
+            max_tokens: Maximum number of tokens to generate
+
+        Yields:
+            Response text chunks
+        """
+        if not stream:
+            response = await self.aclient.chat.completions.create(
+                model=self.chat_deployment,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            yield response.choices[0].message.content
+            return
+
+        async with self.aclient.chat.completions.with_streaming_response.create(
+            model=self.chat_deployment,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            max_tokens=max_tokens,
+        ) as response:
+            async for line in response.iter_lines():
+                content = _sse_content(line)
+                if content:
+                    yield content
+
+    def _classify(self, question: str) -> QueryClass:
+        """
+        Classify the question and extract all filters from a single lowercased copy.
+
+        Args:
+            question: User's question
+
+        Returns:
+            QueryClass with the classification flags and filter expressions
+        """
+        question_lower = question.lower()
+
+        return QueryClass(
+            is_greeting=self._is_greeting_or_conversational(question_lower),
+            is_triage=self._is_bug_triage_query(question_lower),
+            # Count/list queries retrieve more results
+            is_count=self._is_count_or_list_query(question_lower),
+            # Whether the user wants to see the items or just the count
+            wants_list=_WANTS_LIST_PATTERN.search(question_lower) is not None,
+            # Specific work item numbers, type, and state/priority/severity filters
+            wi_filter=self._extract_work_item_filter(question_lower),
+            type_filter=self._extract_work_item_type_filter(question_lower),
+            comp_filter=self._extract_comprehensive_filters(question_lower),
+        )
+
+    async def _retrieve(
+        self, question: str, filter_expr: str, top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Embed the question and run hybrid search, reusing cached results when possible.
+
+        Args:
+            question: User's question
+            filter_expr: OData filter expression
+            top_k: Number of results to return
+
+        Returns:
+            Retrieved documents
+        """
+        self._proxy_cache.sync_version(self.search_manager.index_version)
+        normalized_question = " ".join(question.lower().split())
+
+        relevant_docs = self._proxy_cache.get_exact(normalized_question, filter_expr, top_k)
+        if relevant_docs is not None:
+            logger.debug("Exact query cache hit")
+            return relevant_docs
+
+        question_embedding = await self.embedding_service.agenerate_embedding(question)
+
+        relevant_docs = self._proxy_cache.get_similar(question_embedding, filter_expr, top_k)
+        if relevant_docs is None:
+            relevant_docs = await self._run_io(
+                self.search_manager.hybrid_search,
+                query_text=question,
+                query_vector=question_embedding,
+                top_k=top_k,
+                filter_expr=filter_expr,
+            )
+
+        self._proxy_cache.put(
+            normalized_question, filter_expr, top_k, question_embedding, relevant_docs
+        )
+        return relevant_docs
+
+    async def _vector_search(
+        self, text: str, embedding: List[float], top_k: int, filter_expr: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a vector-only search, reusing results cached for a near-identical embedding.
+
+        Vector-only results depend only on the embedding and filter, so a cached
+        result for an embedding above the similarity threshold is served locally.
+
+        Args:
+            text: Text the embedding was generated from
+            embedding: Query embedding
+            top_k: Number of results to return
+            filter_expr: OData filter expression
+
+        Returns:
+            Retrieved documents
+        """
+        self._vector_cache.sync_version(self.search_manager.index_version)
+
+        documents = self._vector_cache.get_similar(embedding, filter_expr, top_k)
+        if documents is None:
+            documents = await self._run_io(
+                self.search_manager.hybrid_search,
+                query_text="",  # Empty to rely on vector search only
+                query_vector=embedding,
+                top_k=top_k,
+                filter_expr=filter_expr,
+            )
+            self._vector_cache.put(
+                " ".join(text.lower().split()), filter_expr, top_k, embedding, documents
+            )
+        return documents
+
     def _get_system_prompt(self) -> str:
         """
         Get the system prompt for the chat model.
@@ -243,22 +894,19 @@ Remember: Only use information from the provided context. Don't invent details.
 
 Be helpful, concise, and accurate."""
 
-    def _build_context(self, documents: List[Dict]) -> str:
+    def _build_context(self, documents: List[Dict]) -> List[str]:
         """
-        Build context string from retrieved documents.
+        Build context fragments from retrieved documents.
 
         Args:
-            documents: List of retrieved documents
+            documents: Retrieved documents, sorted by work item ID
 
         Returns:
-            Formatted context string
+            Formatted work item blocks interleaved with separators, ready to be joined
         """
-        # Sort documents by work_item_id numerically
-        sorted_docs = sorted(documents, key=lambda doc: int(doc.get("work_item_id", "0")))
-        
         context_parts = []
 
-        for i, doc in enumerate(sorted_docs, 1):
+        for doc in documents:
             work_item_id = doc.get("work_item_id", "Unknown")
             title = doc.get("title", "No title")
             work_item_type = doc.get("work_item_type", "Unknown")
@@ -270,84 +918,57 @@ Be helpful, concise, and accurate."""
             content = doc.get("content", "")
 
             # Build comprehensive work item context with all fields
-            item_context = f"""
-Work Item #{work_item_id}: {title}
-Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
-"""
+            item_parts = [
+                f"Work Item #{work_item_id}: {title}\n"
+                f"Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}\n"
+            ]
             if tags:
-                item_context += f"Tags: {tags}\n"
+                item_parts.append(f"Tags: {tags}\n")
             if created_date:
-                item_context += f"Created: {created_date}\n"
+                item_parts.append(f"Created: {created_date}\n")
             if changed_date:
-                item_context += f"Last Updated: {changed_date}\n"
+                item_parts.append(f"Last Updated: {changed_date}\n")
             
-            item_context += f"\n{content}"
+            item_parts.append(f"\n{content}")
             
-            context_parts.append(item_context.strip())
+            if context_parts:
+                context_parts.append("\n\n---\n\n")
+            context_parts.append("".join(item_parts).strip())
 
-        return "\n\n---\n\n".join(context_parts)
+        return context_parts
 
     def _build_references(self, documents: List[Dict]) -> str:
         """
         Build markdown references for work items.
 
         Args:
-            documents: List of retrieved documents
+            documents: Retrieved documents, sorted by work item ID
 
         Returns:
             Formatted references string
         """
-        # Sort documents by work_item_id numerically
-        sorted_docs = sorted(documents, key=lambda doc: int(doc.get("work_item_id", "0")))
-        
-        references = []
-
-        for doc in sorted_docs:
-            work_item_id = doc.get("work_item_id", "Unknown")
-            title = doc.get("title", "No title")
-            work_item_type = doc.get("work_item_type", "Unknown")
-            state = doc.get("state", "Unknown")
-            url = doc.get("work_item_url", "#")
-
-            reference = f"- [#{work_item_id}]({url}) - **{title}** ({work_item_type} - {state})"
-            references.append(reference)
-
-        return "\n".join(references)
+        return "\n".join(
+            _REFERENCE_TEMPLATE.format_map(ChainMap(doc, _REFERENCE_DEFAULTS))
+            for doc in documents
+        )
 
     def _extract_work_item_type_filter(self, question: str) -> Optional[str]:
         """
         Extract work item type from the question and build a filter expression.
         
         Args:
-            question: User's question
+            question: User's question, lowercased
             
         Returns:
             Filter expression for work item type or None
         """
-        question_lower = question.lower()
-        
-        # Map of common terms to work item types
-        type_mapping = {
-            'bug': 'Bug',
-            'bugs': 'Bug',
-            'issue': 'Bug',
-            'issues': 'Bug',
-            'defect': 'Bug',
-            'defects': 'Bug',
-            'user story': 'User Story',
-            'user stories': 'User Story',
-            'story': 'User Story',
-            'stories': 'User Story',
-            'task': 'Task',
-            'tasks': 'Task',
-            'epic': 'Epic',
-            'epics': 'Epic',
-            'feature': 'Feature',
-            'features': 'Feature',
+        matched_types = {
+            _WORK_ITEM_TYPE_TERMS[match] for match in _TYPE_PATTERN.findall(question)
         }
         
-        for term, work_item_type in type_mapping.items():
-            if re.search(r'\b' + re.escape(term) + r'\b', question_lower):
+        # When several types are mentioned, keep the original term precedence
+        for work_item_type in _WORK_ITEM_TYPE_PRECEDENCE:
+            if work_item_type in matched_types:
                 return f"work_item_type eq '{work_item_type}'"
         
         return None
@@ -357,50 +978,21 @@ Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
         Extract comprehensive filters for state, priority, severity.
         
         Args:
-            question: User question
+            question: User question, lowercased
             
         Returns:
             Combined filter expression or None
         """
-        question_lower = question.lower()
-        filters = []
-        
-        # State filters
-        state_mappings = {
-            'closed': 'Closed',
-            'resolved': 'Resolved',
-            'completed': 'Closed',
-            'done': 'Closed',
-            'active': 'Active',
-            'open': 'Active',
-            'in progress': 'Active',
-            'new': 'New',
-        }
-        
-        for term, state in state_mappings.items():
-            if term in question_lower:
-                filters.append(f"state eq '{state}'")
-                break
-        
-        # Priority filters
-        if 'priority 1' in question_lower or 'p1' in question_lower or 'highest priority' in question_lower:
-            filters.append("priority eq '1'")
-        elif 'priority 2' in question_lower or 'p2' in question_lower or 'high priority' in question_lower:
-            filters.append("priority eq '2'")
-        elif 'priority 3' in question_lower or 'p3' in question_lower or 'medium priority' in question_lower:
-            filters.append("priority eq '3'")
-        elif 'priority 4' in question_lower or 'p4' in question_lower or 'low priority' in question_lower:
-            filters.append("priority eq '4'")
-        
-        # Severity filters
-        if 'critical' in question_lower or 'severity 1' in question_lower:
-            filters.append("severity eq '1 - Critical'")
-        elif 'high severity' in question_lower or 'severity 2' in question_lower:
-            filters.append("severity eq '2 - High'")
-        elif 'medium severity' in question_lower or 'severity 3' in question_lower:
-            filters.append("severity eq '3 - Medium'")
-        elif 'low severity' in question_lower or 'severity 4' in question_lower:
-            filters.append("severity eq '4 - Low'")
+        # One scan per category for state, priority and severity filters
+        filters = [
+            value
+            for value in (
+                _first_phrase_value(_STATE_SCANNER, _STATE_TERMS, question),
+                _first_phrase_value(_PRIORITY_SCANNER, _PRIORITY_TERMS, question),
+                _first_phrase_value(_SEVERITY_SCANNER, _SEVERITY_TERMS, question),
+            )
+            if value
+        ]
         
         if filters:
             return ' and '.join(filters)
@@ -411,23 +1003,12 @@ Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
         Detect if the question is asking for a count or list of items.
         
         Args:
-            question: User's question
+            question: User's question, lowercased
             
         Returns:
             True if it's a count/list query
         """
-        count_patterns = [
-            r'how many',
-            r'count',
-            r'number of',
-            r'list all',
-            r'show all',
-            r'give me all',
-            r'total',
-        ]
-        
-        question_lower = question.lower()
-        return any(re.search(pattern, question_lower) for pattern in count_patterns)
+        return _COUNT_PATTERN.search(question) is not None
     
     def _extract_work_item_filter(self, question: str) -> Optional[str]:
         """
@@ -439,57 +1020,37 @@ Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
         Returns:
             Filter expression for work item IDs or None
         """
-        import re
+        unique_ids = _extract_ids(question)
         
-        # Match patterns like: #123, #61, WI-123, work item 123, item #123
-        patterns = [
-            r'#(\d+)',  # #123
-            r'WI-(\d+)',  # WI-123
-            r'work\s*item\s*#?(\d+)',  # work item 123 or work item #123
-            r'item\s*#?(\d+)',  # item 123 or item #123
-        ]
-        
-        work_item_ids = []
-        for pattern in patterns:
-            matches = re.findall(pattern, question, re.IGNORECASE)
-            work_item_ids.extend(matches)
-        
-        if not work_item_ids:
+        if not unique_ids:
             return None
         
-        # Remove duplicates while preserving order
-        unique_ids = list(dict.fromkeys(work_item_ids))
-        
         # Build filter expression
         if len(unique_ids) == 1:
             return f"work_item_id eq '{unique_ids[0]}'"
         else:
             # Multiple work items: (work_item_id eq '123' or work_item_id eq '456')
-            conditions = [f"work_item_id eq '{wid}'" for wid in unique_ids]
-            return "(" + " or ".join(conditions) + ")"
+            return "(" + " or ".join(f"work_item_id eq '{wid}'" for wid in unique_ids) + ")"
     
     def _is_bug_triage_query(self, question: str) -> bool:
         """
         Detect if user is asking to triage a bug or find similar bugs.
         
         Args:
-            question: User's question
+            question: User's question, lowercased
             
         Returns:
             True if it's a bug triage/similarity query
         """
-        question_lower = question.lower()
-        
-        triage_patterns = [
-            'similar bug', 'duplicate bug', 'same bug', 'related bug',
-            'already logged', 'already reported', 'already exists',
-            'valid bug', 'is this a bug', 'triage', 'related requirement',
-            'match with requirement', 'associated requirement', 'check for duplicate'
-        ]
-        
-        return any(pattern in question_lower for pattern in triage_patterns)
+        return _TRIAGE_PATTERN.search(question) is not None
     
-    def _handle_bug_triage(self, question: str, temperature: float = 0.3, stream: bool = True):
+    async def _handle_bug_triage(
+        self,
+        question: str,
+        temperature: float = 0.3,
+        stream: bool = True,
+        question_embedding: Optional[List[float]] = None,
+    ) -> AsyncGenerator[str, None]:
         """
         Handle bug triage queries: find similar bugs, match with requirements, determine validity.
         
@@ -497,11 +1058,15 @@ Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
             question: User's question
             temperature: Temperature for response generation
             stream: Whether to stream the response
+            question_embedding: Precomputed embedding of the question, if available
             
         Yields:
             Response chunks
         """
         try:
+            if question_embedding is None:
+                question_embedding = await self.embedding_service.agenerate_embedding(question)
+
             # Extract bug ID if mentioned
             bug_id_filter = self._extract_work_item_filter(question)
             
@@ -512,9 +1077,10 @@ Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
             if bug_id_filter:
                 # Fetch the specific bug
                 filter_expr = f"(is_metadata eq false or is_metadata eq null) and ({bug_id_filter}) and (work_item_type eq 'Bug')"
-                bugs = self.search_manager.hybrid_search(
+                bugs = await self._run_io(
+                    self.search_manager.hybrid_search,
                     query_text=question,
-                    query_vector=self.embedding_service.generate_embedding(question),
+                    query_vector=question_embedding,
                     top_k=1,
                     filter_expr=filter_expr
                 )
@@ -537,20 +1103,27 @@ Type: {work_item_type} | State: {state} | Assigned To: {assigned_to}
             
             # Use full bug content for semantic embedding - captures complete context
             # Use vector-only search (empty query_text) to rely on semantic similarity
+            # Both searches use the same text, so embed it once, reusing the question embedding
             embedding_text = bug_description if bug_description else question
-            similar_bugs = self.search_manager.hybrid_search(
-                query_text="",  # Empty to rely on vector search only
-                query_vector=self.embedding_service.generate_embedding(embedding_text),
-                top_k=10,
-                filter_expr=similar_bugs_filter
-            )
+            if embedding_text == question:
+                triage_embedding = question_embedding
+            else:
+                triage_embedding = await self.embedding_service.agenerate_embedding(embedding_text)
             
-            # Search for related requirements (User Stories) using full content
-            requirements = self.search_manager.hybrid_search(
-                query_text="",  # Empty to rely on vector search only
-                query_vector=self.embedding_service.generate_embedding(embedding_text),
-                top_k=5,
-                filter_expr="(is_metadata eq false or is_metadata eq null) and (work_item_type eq 'User Story')"
+            # Search for similar bugs and related requirements (User Stories) concurrently
+            similar_bugs, requirements = await asyncio.gather(
+                self._vector_search(
+                    embedding_text,
+                    triage_embedding,
+                    top_k=10,
+                    filter_expr=similar_bugs_filter
+                ),
+                self._vector_search(
+                    embedding_text,
+                    triage_embedding,
+                    top_k=5,
+                    filter_expr="(is_metadata eq false or is_metadata eq null) and (work_item_type eq 'User Story')"
+                ),
             )
             
             # Build context
@@ -603,7 +1176,6 @@ Repro Steps:
             else:
                 context_parts.append("\n\nNo directly related requirements found.")
             
-            context = "\n".join(context_parts)
             
             # Build triage prompt
             triage_prompt = """Analyze this bug and provide:
@@ -619,24 +1191,12 @@ Repro Steps:
 Provide a clear, structured analysis with specific references to work item IDs."""
             
             messages = [
-                {"role": "system", "content": "You are a bug triage specialist. Analyze bugs for duplicates, match them with requirements, and provide triage decisions based on the provided context."},
-                {"role": "user", "content": f"{context}\n\n{triage_prompt}"}
+                self._triage_system_message,
+                {"role": "user", "content": "\n".join([*context_parts, "", triage_prompt])}
             ]
             
-            response = self.client.chat.completions.create(
-                model=self.chat_deployment,
-                messages=messages,
-                temperature=temperature,
-                stream=stream,
-                max_tokens=1500
-            )
-            
-            if stream:
-                for chunk in response:
-                    if chunk.choices and chunk.choices[0].delta.content:
-                        yield chunk.choices[0].delta.content
-            else:
-                yield response.choices[0].message.content
+            async for chunk in self._complete(messages, temperature, stream, max_tokens=1500):
+                yield chunk
             
             # Add references
             if similar_bugs or requirements:
@@ -659,38 +1219,22 @@ Provide a clear, structured analysis with specific references to work item IDs."
         Check if the query is a simple greeting or conversational message.
 
         Args:
-            text: Query text
+            text: Query text, lowercased
 
         Returns:
             True if it's a greeting/conversational, False otherwise
         """
-        text_lower = text.lower().strip()
-        
-        # Simple greetings
-        greetings = [
-            "hi", "hello", "hey", "greetings", "good morning", "good afternoon", 
-            "good evening", "howdy", "hiya", "sup", "what's up", "whats up"
-        ]
-        
-        # Conversational phrases that don't need work item search
-        conversational = [
-            "how are you", "thank you", "thanks", "bye", "goodbye", "ok", "okay",
-            "nice", "cool", "great", "awesome", "perfect"
-        ]
+        text_lower = text.strip()
         
         # Check if text is just a greeting or conversational
-        if text_lower in greetings or text_lower in conversational:
+        if text_lower in _GREETING_OR_CONVERSATIONAL:
             return True
         
-        # Check if text starts with greeting
-        for greeting in greetings:
-            if text_lower.startswith(greeting + " ") or text_lower.startswith(greeting + "!"):
-                # But not if it's followed by a work item question
-                question_keywords = ["show", "find", "search", "get", "list", "what", "how", "which", "when", "who", "bug", "issue", "task", "work item"]
-                if not any(keyword in text_lower for keyword in question_keywords):
-                    return True
-        
-        return False
+        # Check if text starts with greeting, but not if it's followed by a work item question
+        return (
+            _GREETING_PREFIX_PATTERN.match(text_lower) is not None
+            and _QUESTION_KEYWORD_PATTERN.search(text_lower) is None
+        )
 
     def _get_conversational_response(self, text: str) -> str:
         """
@@ -704,7 +1248,7 @@ Provide a clear, structured analysis with specific references to work item IDs."
         """
         text_lower = text.lower().strip()
         
-        if any(greeting in text_lower for greeting in ["hi", "hello", "hey", "good morning", "good afternoon", "good evening"]):
+        if _HELLO_PATTERN.search(text_lower):
             return ("Hello! I'm your Azure DevOps Work Item Assistant. I can help you find and analyze work items from your DemoBugSense project.\n\n"
                    "Try asking me questions like:\n"
                    "- 'Show me all open bugs'\n"
@@ -716,7 +1260,7 @@ Provide a clear, structured analysis with specific references to work item IDs."
         elif "thank" in text_lower:
             return "You're welcome! Feel free to ask me anything about your work items."
         
-        elif any(bye in text_lower for bye in ["bye", "goodbye"]):
+        elif _BYE_PATTERN.search(text_lower):
             return "Goodbye! Come back anytime you need help with your work items."
         
         else:
@@ -730,9 +1274,6 @@ Provide a clear, structured analysis with specific references to work item IDs."
             text: Text to search for work item IDs
 
         Returns:
-            List of work item IDs
+            List of unique work item IDs, in order of appearance
         """
-        # Pattern to match Work Item #123 or #123
-        pattern = r"#(\d+)"
-        matches = re.findall(pattern, text)
-        return list(set(matches))  # Remove duplicates
+        return list(_extract_ids(text))
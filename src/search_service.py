@@ -1,14 +1,26 @@
 """Azure AI Search service for indexing and retrieving work items."""
 
+import functools
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-
+import random
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import requests
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import RequestsTransport
+from azure.core.rest import HttpRequest
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
     HnswAlgorithmConfiguration,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
@@ -17,12 +29,87 @@ from azure.search.documents.indexes.models import (
     SemanticPrioritizedFields,
     SemanticSearch,
     VectorSearch,
+    VectorSearchCompressionTarget,
     VectorSearchProfile,
 )
-from azure.search.documents.models import VectorizedQuery
+from azure.search.documents.models import IndexingResult, VectorizedQuery
+
+# Try to import orjson for fast upload payload encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Search REST API version used by the clients and by raw indexing requests
+_SEARCH_API_VERSION = "2024-07-01"
+
+# Azure AI Search accepts at most 1000 actions and 16 MB per indexing request
+_MAX_BATCH_ACTIONS = 1000
+_MIN_BATCH_BYTES = 256 * 1024
+_MAX_BATCH_BYTES = 12 * 1024 * 1024
+
+# Matches work item documents; the sync metadata document is stored as a non-vector row
+_WORK_ITEMS_FILTER = "is_metadata eq false or is_metadata eq null"
+
+# Status codes Azure AI Search returns when throttling or briefly unavailable
+_RETRYABLE_STATUS_CODES = frozenset({429, 503})
+
+# Approximate serialized size of one float in a JSON vector, and of per-field overhead
+_BYTES_PER_VECTOR_VALUE = 21
+_BYTES_PER_FIELD = 32
+
+# Fields returned by vector and hybrid search, and copied into each result document
+_SEARCH_FIELDS = (
+    "work_item_id",
+    "title",
+    "description",
+    "work_item_type",
+    "state",
+    "assigned_to",
+    "tags",
+    "work_item_url",
+    "content",
+)
+_HYBRID_SEARCH_FIELDS = (
+    "work_item_id",
+    "title",
+    "description",
+    "work_item_type",
+    "state",
+    "assigned_to",
+    "tags",
+    "created_date",
+    "changed_date",
+    "work_item_url",
+    "content",
+)
+
+# Comma-separated select clauses, joined once; the SDK ignores select values that
+# are neither a str nor a list, and re-joins lists on every call
+_SEARCH_SELECT = ",".join(_SEARCH_FIELDS)
+_HYBRID_SEARCH_SELECT = ",".join(_HYBRID_SEARCH_FIELDS)
+
+# Seconds that the sync metadata document and the total work item count are cached
+_SYNC_METADATA_TTL = 30.0
+_WORK_ITEM_COUNT_TTL = 60.0
+
+
+def _work_items_filter(filter_expr: Optional[str]) -> str:
+    """
+    Restrict an optional OData filter to work item documents.
+
+    Args:
+        filter_expr: Caller filter expression, if any
+
+    Returns:
+        Filter expression that also excludes the sync metadata document
+    """
+    if not filter_expr:
+        return _WORK_ITEMS_FILTER
+    return f"({_WORK_ITEMS_FILTER}) and ({filter_expr})"
+
 
 class SearchIndexManager:
     """Manages Azure AI Search index operations for work items."""
@@ -35,6 +122,9 @@ class SearchIndexManager:
         api_key: str,
         index_name: str,
         embedding_dimension: int = 1536,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 100,
     ):
         """
         Initialize Search Index Manager.
@@ -44,17 +134,56 @@ class SearchIndexManager:
             api_key: Azure AI Search admin key
             index_name: Name of the search index
             embedding_dimension: Dimension of embedding vectors (default: 1536 for text-embedding-3-small)
+            hnsw_m: Number of bi-directional links per node in the HNSW graph
+            hnsw_ef_construction: Candidate list size used while building the HNSW graph
+            hnsw_ef_search: Candidate list size used at query time
         """
         self.endpoint = endpoint
         self.index_name = index_name
         self.embedding_dimension = embedding_dimension
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
 
         credential = AzureKeyCredential(api_key)
-        self.index_client = SearchIndexClient(endpoint=endpoint, credential=credential)
+
+        # One pooled HTTP session shared by both clients, so connections are reused
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        transport = RequestsTransport(session=session, session_owner=False)
+        client_options = {
+            "api_version": _SEARCH_API_VERSION,
+            "transport": transport,
+            "retry_total": 5,
+            "retry_backoff_factor": 0.8,
+        }
+
+        self.index_client = SearchIndexClient(
+            endpoint=endpoint, credential=credential, **client_options
+        )
         self.search_client = SearchClient(
-            endpoint=endpoint, index_name=index_name, credential=credential
+            endpoint=endpoint, index_name=index_name, credential=credential, **client_options
         )
 
+        # Incremented whenever indexed work items change, so callers can invalidate caches
+        self.index_version = 0
+
+        # Target payload size per indexing request, tuned from recent request latencies
+        self._target_bytes = 4 * 1024 * 1024
+        self._upload_latencies: deque = deque(maxlen=5)
+
+        # (fetched at, metadata) and (fetched at, index_version, count) for short-lived reuse
+        self._metadata_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._work_item_count_cache: Optional[Tuple[float, int, int]] = None
+
+        # Cleared if the index predates facetable metadata fields
+        self._summary_facets_supported = True
+
+        # Filtered counts keyed by (filter_expr, index_version, TTL window); failures are not cached
+        self._cached_count = functools.lru_cache(maxsize=256)(self._query_count)
+
     def create_index(self) -> None:
         """Create the search index with vector and semantic search configuration."""
         logger.info(f"Creating search index: {self.index_name}")
@@ -146,16 +275,19 @@ class SearchIndexManager:
                 name="is_metadata",
                 type=SearchFieldDataType.Boolean,
                 filterable=True,
+                facetable=True,
             ),
             SearchField(
                 name="last_sync_time",
                 type=SearchFieldDataType.DateTimeOffset,
                 filterable=True,
+                facetable=True,
             ),
             SearchField(
                 name="work_item_count",
                 type=SearchFieldDataType.Int32,
                 filterable=True,
+                facetable=True,
             ),
         ]
 
@@ -165,17 +297,30 @@ class SearchIndexManager:
                 HnswAlgorithmConfiguration(
                     name="hnsw-algorithm",
                     parameters={
-                        "m": 4,
-                        "efConstruction": 400,
-                        "efSearch": 500,
+                        "m": self.hnsw_m,
+                        "efConstruction": self.hnsw_ef_construction,
+                        "efSearch": self.hnsw_ef_search,
                         "metric": "cosine",
                     },
                 )
             ],
+            # Build the HNSW graph over int8-quantized vectors; the full-precision
+            # originals are kept to rescore the oversampled candidates
+            compressions=[
+                ScalarQuantizationCompression(
+                    compression_name="sq-int8",
+                    parameters=ScalarQuantizationParameters(
+                        quantized_data_type=VectorSearchCompressionTarget.INT8
+                    ),
+                    rerank_with_original_vectors=True,
+                    default_oversampling=4.0,
+                )
+            ],
             profiles=[
                 VectorSearchProfile(
                     name="vector-profile",
                     algorithm_configuration_name="hnsw-algorithm",
+                    compression_name="sq-int8",
                 )
             ],
         )
@@ -207,6 +352,7 @@ class SearchIndexManager:
         )
 
         self.index_client.create_or_update_index(index)
+        self.index_version += 1
         logger.info(f"Search index '{self.index_name}' created successfully")
 
     def index_exists(self) -> bool:
@@ -229,13 +375,165 @@ class SearchIndexManager:
             return
 
         try:
-            result = self.search_client.upload_documents(documents=documents)
-            success_count = sum(1 for r in result if r.succeeded)
+            success_count = 0
+            for batch in self._batch_by_size(documents):
+                result = self._index_with_retry(
+                    self._upload_documents, batch, tune_batch_size=True
+                )
+                self.index_version += 1
+                success_count += sum(1 for r in result if r.succeeded)
             logger.info(f"Upserted {success_count}/{len(documents)} documents")
         except Exception as e:
             logger.error(f"Error upserting documents: {e}")
             raise
 
+    def _upload_documents(
+        self, documents: List[Dict[str, Any]], **kwargs: Any
+    ) -> List[IndexingResult]:
+        """
+        Send one upload request, encoding the payload with orjson when available.
+
+        The SDK serializes every vector value through its model serializer and
+        the stdlib json encoder; this posts pre-encoded bytes to the same
+        indexing endpoint instead.
+
+        Args:
+            documents: Documents to upload
+            **kwargs: Per-request options passed to the SDK pipeline
+
+        Returns:
+            Per-document indexing results
+        """
+        if orjson is None:
+            return self.search_client.upload_documents(documents=documents, **kwargs)
+
+        payload = orjson.dumps(
+            {"value": [{"@search.action": "upload", **doc} for doc in documents]},
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+        request = HttpRequest(
+            "POST",
+            "/docs/search.index",
+            params={"api-version": _SEARCH_API_VERSION},
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+            content=payload,
+        )
+        response = self.search_client.send_request(request, **kwargs)
+        # 207 means some documents failed; those are reported per result
+        if response.status_code not in (200, 207):
+            raise HttpResponseError(response=response)
+
+        return [
+            IndexingResult.deserialize(item)
+            for item in orjson.loads(response.read())["value"]
+        ]
+
+    def _batch_by_size(self, documents: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Split documents into indexing requests of roughly the current target payload size.
+
+        Args:
+            documents: Documents to upload
+
+        Returns:
+            List of document batches
+        """
+        batches = []
+        batch: List[Dict[str, Any]] = []
+        batch_bytes = 0
+        target_bytes = self._target_bytes
+
+        for doc in documents:
+            doc_bytes = self._estimate_document_bytes(doc)
+            if batch and (
+                batch_bytes + doc_bytes > target_bytes or len(batch) >= _MAX_BATCH_ACTIONS
+            ):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(doc)
+            batch_bytes += doc_bytes
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _estimate_document_bytes(doc: Dict[str, Any]) -> int:
+        """
+        Estimate the serialized size of a document without encoding it.
+
+        Args:
+            doc: Document to upload
+
+        Returns:
+            Approximate payload size in bytes
+        """
+        size = 0
+        for value in doc.values():
+            if isinstance(value, str):
+                size += len(value)
+            elif isinstance(value, list):
+                size += len(value) * _BYTES_PER_VECTOR_VALUE
+            size += _BYTES_PER_FIELD
+        return size
+
+    def _index_with_retry(
+        self,
+        action: Callable[..., List[Any]],
+        documents: List[Dict[str, Any]],
+        tune_batch_size: bool = False,
+        max_attempts: int = 5,
+        base: float = 1.0,
+        cap: float = 60.0,
+    ) -> List[Any]:
+        """
+        Send one indexing request, retrying throttled requests.
+
+        When tuning, fast requests grow the target payload size by 1.5x and slow
+        or throttled ones halve it.
+
+        Args:
+            action: Search client method to call, e.g. upload_documents; it must
+                accept SDK per-request options such as retry_total
+            documents: Documents for the request
+            tune_batch_size: Whether to adapt the upload target size from this request
+            max_attempts: Maximum number of attempts before giving up
+            base: Base delay in seconds for exponential backoff
+            cap: Maximum delay in seconds
+
+        Returns:
+            Per-document indexing results
+        """
+        for attempt in range(max_attempts):
+            started = time.perf_counter()
+            try:
+                # This loop owns retries for indexing, so the client's own are turned off
+                result = action(documents=documents, retry_total=0)
+            except HttpResponseError as e:
+                if e.status_code not in _RETRYABLE_STATUS_CODES or attempt == max_attempts - 1:
+                    raise
+                if tune_batch_size:
+                    self._target_bytes = max(_MIN_BATCH_BYTES, self._target_bytes // 2)
+                delay = min(cap, base * 2 ** attempt) + random.random()
+                logger.warning(
+                    f"Search service throttled (attempt {attempt + 1}/{max_attempts}), "
+                    f"retrying in {delay:.1f}s: {e}"
+                )
+                time.sleep(delay)
+                continue
+
+            if not tune_batch_size:
+                return result
+
+            self._upload_latencies.append(time.perf_counter() - started)
+            median_latency = statistics.median(self._upload_latencies)
+            if median_latency < 0.2:
+                self._target_bytes = min(_MAX_BATCH_BYTES, int(self._target_bytes * 1.5))
+            elif median_latency > 2.0:
+                self._target_bytes = max(_MIN_BATCH_BYTES, self._target_bytes // 2)
+            return result
+
     def get_sync_metadata(self) -> Optional[Dict[str, Any]]:
         """
         Retrieve sync metadata from the index.
@@ -243,28 +541,95 @@ class SearchIndexManager:
         Returns:
             Dictionary containing last_sync_time and work_item_count, or None if not found
         """
+        cached = self._metadata_cache
+        if cached is not None and time.monotonic() - cached[0] < _SYNC_METADATA_TTL:
+            return dict(cached[1])
+
         try:
             result = self.search_client.get_document(key=self.METADATA_DOC_ID)
-            return {
-                "last_sync_time": result.get("last_sync_time"),
-                "work_item_count": result.get("work_item_count", 0),
-            }
         except Exception:
             return None
 
+        metadata = {
+            "last_sync_time": result.get("last_sync_time"),
+            "work_item_count": result.get("work_item_count", 0),
+        }
+        self._metadata_cache = (time.monotonic(), metadata)
+        return dict(metadata)
+
+    def get_sync_summary(self) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Retrieve sync metadata and the work item count in a single request.
+
+        The metadata fields are only set on the metadata document, so value
+        facets over them return its values alongside the total document count.
+        Indexes created before these fields were facetable fall back to
+        separate metadata and count requests.
+
+        Returns:
+            Tuple of (metadata dictionary or None if not found, work item count)
+        """
+        if not self._summary_facets_supported:
+            return self.get_sync_metadata(), self.get_work_item_count()
+
+        try:
+            index_version = self.index_version
+            results = self.search_client.search(
+                search_text="*",
+                include_total_count=True,
+                facets=["is_metadata", "last_sync_time", "work_item_count"],
+                top=0,
+            )
+            total = results.get_count()
+            facets = results.get_facets() or {}
+        except HttpResponseError as e:
+            # 400 means the fields are not facetable in this index; anything else may be transient
+            if e.status_code == 400:
+                logger.warning(f"Sync summary facets unavailable, using separate requests: {e}")
+                self._summary_facets_supported = False
+            else:
+                logger.warning(f"Sync summary request failed, using separate requests: {e}")
+            return self.get_sync_metadata(), self.get_work_item_count()
+        except Exception:
+            return None, 0
+
+        metadata_docs = sum(
+            bucket["count"] for bucket in facets.get("is_metadata", []) if bucket["value"] is True
+        )
+        sync_times = facets.get("last_sync_time", [])
+        counts = facets.get("work_item_count", [])
+
+        metadata = None
+        if metadata_docs and sync_times:
+            metadata = {
+                "last_sync_time": sync_times[0]["value"],
+                "work_item_count": counts[0]["value"] if counts else 0,
+            }
+            self._metadata_cache = (time.monotonic(), metadata)
+            metadata = dict(metadata)
+
+        count = total - metadata_docs
+        self._work_item_count_cache = (time.monotonic(), index_version, count)
+        return metadata, count
+
     def update_sync_metadata(
         self, last_sync_time: datetime, work_item_count: int
     ) -> None:
         """
         Update sync metadata in the index.
 
+        The metadata document has no content_vector, so it never enters the
+        vector index.
+
         Args:
             last_sync_time: Timestamp of the last successful sync
             work_item_count: Total number of work items indexed
         """
-        # Format datetime with timezone for Edm.DateTimeOffset
-        last_sync_time_str = last_sync_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-        
+        # Format datetime as UTC for Edm.DateTimeOffset
+        if last_sync_time.tzinfo is not None:
+            last_sync_time = last_sync_time.astimezone(timezone.utc).replace(tzinfo=None)
+        last_sync_time_str = last_sync_time.isoformat(timespec="microseconds") + "Z"
+
         metadata_doc = {
             "id": self.METADATA_DOC_ID,
             "is_metadata": True,
@@ -278,11 +643,11 @@ class SearchIndexManager:
             "project_name": "System",
             "work_item_url": "",
             "content": "",
-            "content_vector": [0.0] * self.embedding_dimension,  # Dummy vector
         }
 
         try:
             self.search_client.upload_documents(documents=[metadata_doc])
+            self._metadata_cache = None
             logger.info(f"Updated sync metadata: {work_item_count} work items")
         except Exception as e:
             logger.error(f"Error updating sync metadata: {e}")
@@ -313,25 +678,16 @@ class SearchIndexManager:
             results = self.search_client.search(
                 search_text=None,
                 vector_queries=[vector_query],
-                filter=filter_expr,
-                select=[
-                    "work_item_id",
-                    "title",
-                    "description",
-                    "work_item_type",
-                    "state",
-                    "assigned_to",
-                    "tags",
-                    "work_item_url",
-                    "content",
-                ],
+                filter=_work_items_filter(filter_expr),
+                select=_SEARCH_SELECT,
                 top=top_k,
             )
 
             documents = []
             for result in results:
-                doc = dict(result)
-                doc["score"] = result.get("@search.score", 0)
+                # Copy only the selected fields and the score
+                doc = {key: result[key] for key in _SEARCH_FIELDS if key in result}
+                doc["@search.score"] = doc["score"] = result.get("@search.score", 0)
                 documents.append(doc)
 
             logger.info(f"Search returned {len(documents)} results")
@@ -368,20 +724,8 @@ class SearchIndexManager:
             results = self.search_client.search(
                 search_text=query_text,
                 vector_queries=[vector_query],
-                filter=filter_expr,
-                select=[
-                    "work_item_id",
-                    "title",
-                    "description",
-                    "work_item_type",
-                    "state",
-                    "assigned_to",
-                    "tags",
-                    "created_date",
-                    "changed_date",
-                    "work_item_url",
-                    "content",
-                ],
+                filter=_work_items_filter(filter_expr),
+                select=_HYBRID_SEARCH_SELECT,
                 top=top_k,
                 query_type="semantic",
                 semantic_configuration_name="semantic-config",
@@ -389,8 +733,9 @@ class SearchIndexManager:
 
             documents = []
             for result in results:
-                doc = dict(result)
-                doc["score"] = result.get("@search.score", 0)
+                # Copy only the selected fields and the scores
+                doc = {key: result[key] for key in _HYBRID_SEARCH_FIELDS if key in result}
+                doc["@search.score"] = doc["score"] = result.get("@search.score", 0)
                 doc["reranker_score"] = result.get("@search.reranker_score", 0)
                 documents.append(doc)
 
@@ -408,16 +753,29 @@ class SearchIndexManager:
         Returns:
             Total number of work items in the index
         """
+        # Reuse a recent count as long as this manager has not changed the index since
+        cached = self._work_item_count_cache
+        if (
+            cached is not None
+            and cached[1] == self.index_version
+            and time.monotonic() - cached[0] < _WORK_ITEM_COUNT_TTL
+        ):
+            return cached[2]
+
         try:
+            index_version = self.index_version
             results = self.search_client.search(
                 search_text="*",
-                filter="is_metadata eq false or is_metadata eq null",
+                filter=_WORK_ITEMS_FILTER,
                 include_total_count=True,
                 top=0,
             )
-            return results.get_count()
+            count = results.get_count()
         except Exception:
             return 0
+
+        self._work_item_count_cache = (time.monotonic(), index_version, count)
+        return count
     
     def get_filtered_count(self, filter_expr: str) -> int:
         """
@@ -430,63 +788,137 @@ class SearchIndexManager:
             Count of matching work items
         """
         try:
-            logger.info(f"Getting count with filter: {filter_expr}")
-            results = self.search_client.search(
-                search_text="*",
-                filter=filter_expr,
-                include_total_count=True,
-                top=0,
+            # The TTL window expires counts that other processes' changes have made stale
+            count = self._cached_count(
+                filter_expr, self.index_version, int(time.monotonic() // _WORK_ITEM_COUNT_TTL)
             )
-            count = results.get_count()
             logger.info(f"Filtered count result: {count}")
             return count
         except Exception as e:
             logger.error(f"Error getting filtered count: {e}")
             return 0
+
+    def _query_count(self, filter_expr: str, index_version: int, ttl_window: int) -> int:
+        """
+        Query the index for the count of work items matching a filter expression.
+
+        Args:
+            filter_expr: OData filter expression
+            index_version: Index version the count is cached against
+            ttl_window: Time window the count is cached for
+
+        Returns:
+            Count of matching work items
+        """
+        logger.info(f"Getting count with filter: {filter_expr}")
+        results = self.search_client.search(
+            search_text="*",
+            filter=filter_expr,
+            include_total_count=True,
+            top=0,
+        )
+        return results.get_count()
     
-    def get_all_work_item_ids(self) -> set:
+    def get_all_work_item_ids(self, page_size: int = 1000) -> FrozenSet[str]:
         """
         Get all work item IDs from the search index.
+
+        Pages through the index in document key order, so there is no cap on
+        the number of IDs returned.
         
+        Args:
+            page_size: Number of documents requested per page
+
         Returns:
             Set of work item IDs as strings
         """
         try:
-            results = self.search_client.search(
-                search_text="*",
-                filter="is_metadata eq false or is_metadata eq null",
-                select=["work_item_id"],
-                top=10000  # Adjust if you have more items
-            )
-            
-            work_item_ids = set(str(doc['work_item_id']) for doc in results)
+            work_item_ids = set()
+            last_id = None
+
+            while True:
+                filter_expr = f"({_WORK_ITEMS_FILTER})"
+                if last_id is not None:
+                    escaped_id = last_id.replace("'", "''")
+                    filter_expr += f" and id gt '{escaped_id}'"
+
+                results = self.search_client.search(
+                    search_text="*",
+                    filter=filter_expr,
+                    select=["id", "work_item_id"],
+                    order_by=["id asc"],
+                    top=page_size,
+                )
+
+                page_count = 0
+                for doc in results:
+                    work_item_ids.add(doc["work_item_id"])
+                    last_id = doc["id"]
+                    page_count += 1
+
+                if page_count < page_size:
+                    break
+
             logger.info(f"Retrieved {len(work_item_ids)} work item IDs from index")
-            return work_item_ids
+            return frozenset(work_item_ids)
         except Exception as e:
             logger.error(f"Error getting work item IDs: {e}")
-            return set()
+            return frozenset()
     
-    def delete_documents(self, work_item_ids: list, project_name: str) -> None:
+    def delete_documents(
+        self, work_item_ids: list, project_name: str, max_workers: int = 4
+    ) -> None:
         """
         Delete documents from the search index by work item IDs.
-        
+
         Args:
             work_item_ids: List of work item IDs to delete
             project_name: Project name to construct full document IDs
+            max_workers: Maximum number of delete requests in flight at once
+        """
+        # Create documents with proper ID format: {project_name}_{work_item_id}
+        self.delete_by_docs(
+            [{"id": f"{project_name}_{wid}"} for wid in work_item_ids],
+            max_workers=max_workers,
+        )
+
+    def delete_by_docs(
+        self, documents_to_delete: List[Dict[str, str]], max_workers: int = 4
+    ) -> None:
+        """
+        Delete documents from the search index by their full document IDs.
+
+        Deletions are sent in batches of at most 1000 actions, several at a time.
+
+        Args:
+            documents_to_delete: Documents of the form {"id": "<project>_<work item id>"}
+            max_workers: Maximum number of delete requests in flight at once
         """
         try:
-            if not work_item_ids:
+            if not documents_to_delete:
                 return
+
+            batches = [
+                documents_to_delete[i:i + _MAX_BATCH_ACTIONS]
+                for i in range(0, len(documents_to_delete), _MAX_BATCH_ACTIONS)
+            ]
             
-            # Create documents with proper ID format: {project_name}_{work_item_id}
-            documents_to_delete = [{"id": f"{project_name}_{wid}"} for wid in work_item_ids]
-            
-            logger.info(f"Deleting {len(documents_to_delete)} documents from index")
-            result = self.search_client.delete_documents(documents=documents_to_delete)
+            logger.info(
+                f"Deleting {len(documents_to_delete)} documents from index in {len(batches)} batches"
+            )
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(
+                        lambda batch: self._index_with_retry(self.search_client.delete_documents, batch),
+                        batches,
+                    ))
+            finally:
+                # Some batches may have been applied even if another one failed
+                self.index_version += 1
             
             # Check results
-            succeeded = sum(1 for r in result if r.succeeded)
-            failed = len(result) - succeeded
+            succeeded = sum(1 for result in results for r in result if r.succeeded)
+            failed = len(documents_to_delete) - succeeded
             
             if failed > 0:
                 logger.warning(f"Deleted {succeeded} documents, {failed} failed")
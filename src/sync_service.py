@@ -1,8 +1,14 @@
 """Sync service for orchestrating work item synchronization."""
 
+import asyncio
+import itertools
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 from .ado_service import ADOConnector
 from .embedding_service import EmbeddingService
@@ -10,6 +16,46 @@ from .search_service import SearchIndexManager
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Directory for per-project sync state: the last successful sync time, and the
+# high-water mark checkpoint kept when the index metadata update fails
+SYNC_STATE_DIR = os.path.join(os.path.expanduser("~"), ".adorag")
+
+# Fractional seconds in ADO timestamps vary in length; fromisoformat needs 3 or 6 digits
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parse an ADO or index timestamp into a timezone-aware UTC datetime.
+
+    Args:
+        value: datetime or ISO 8601 string (e.g., '2024-01-31T12:00:00.12Z')
+
+    Returns:
+        Parsed datetime, or None if value is empty or unparseable
+    """
+    if not value:
+        return None
+
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        # A trailing Z parses as naive and is marked UTC below
+        text = str(value)
+        if text.endswith("Z"):
+            text = text[:-1]
+        text = _FRACTION_RE.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text)
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
 
 class SyncManager:
     """Manages synchronization of work items from ADO to Azure AI Search."""
@@ -34,11 +80,16 @@ class SyncManager:
         self.embedding_service = embedding_service
         self.search_manager = search_manager
         self.project_name = project_name
+        self._state_path = os.path.join(SYNC_STATE_DIR, f"sync_state_{project_name}.json")
+        self._checkpoint_path = os.path.join(SYNC_STATE_DIR, f"sync_checkpoint_{project_name}.json")
+
+        # Latest changed_date among work items uploaded by the most recent sync
+        self.last_high_water_mark: Optional[datetime] = None
 
     def sync(
         self,
         force_full_sync: bool = False,
-        batch_size: int = 50,
+        batch_size: int = 256,
         progress_callback: Optional[callable] = None,
     ) -> Tuple[int, int]:
         """
@@ -58,80 +109,53 @@ class SyncManager:
             progress_callback("init", 0, 100, "Initializing sync...")
 
         # Ensure index exists
+        index_created = False
         if not self.search_manager.index_exists():
             logger.info("Index does not exist, creating...")
             if progress_callback:
                 progress_callback("index", 5, 100, "Creating search index...")
             self.search_manager.create_index()
+            index_created = True
 
-        # Get last sync time
-        sync_metadata = self.search_manager.get_sync_metadata()
         last_sync_time = None
 
-        if not force_full_sync and sync_metadata:
-            last_sync_time_str = sync_metadata.get("last_sync_time")
-            if last_sync_time_str:
-                last_sync_time = datetime.fromisoformat(last_sync_time_str.replace("Z", "+00:00"))
+        # A new index has no prior sync, so local state and checkpoints do not apply
+        if not force_full_sync and not index_created:
+            # Prefer the local copy of the last sync time
+            last_sync_time = self._read_sync_state()
+
+            if last_sync_time is None:
+                # The work item count is cached for the no-change path
+                sync_metadata, _ = self.search_manager.get_sync_summary()
+                if sync_metadata:
+                    last_sync_time = _parse_timestamp(sync_metadata.get("last_sync_time"))
+
+            # A newer local checkpoint means the last metadata update failed
+            checkpoint_time = self._read_checkpoint()
+            if checkpoint_time and (last_sync_time is None or checkpoint_time > last_sync_time):
+                logger.info(f"Resuming from local sync checkpoint: {checkpoint_time}")
+                last_sync_time = checkpoint_time
+
+            if last_sync_time:
                 logger.info(f"Last sync time: {last_sync_time}")
 
-        # Fetch work items from ADO
+        # Stream work items from ADO through a fetch -> embed -> index pipeline
         logger.info("Fetching work items from Azure DevOps...")
         if progress_callback:
             progress_callback("fetch", 10, 100, "Fetching work items from Azure DevOps...")
-        
-        work_items = self.ado_connector.fetch_work_items(
-            project_name=self.project_name,
-            last_sync_time=last_sync_time,
+
+        self.last_high_water_mark = None
+        synced_count = asyncio.run(
+            self._run_pipeline(last_sync_time, batch_size, progress_callback)
         )
 
-        if not work_items:
+        if synced_count == 0:
             logger.info("No work items to sync")
             total_count = self.search_manager.get_work_item_count()
             if progress_callback:
                 progress_callback("complete", 100, 100, "No new items to sync")
             return 0, total_count
 
-        logger.info(f"Fetched {len(work_items)} work items")
-        if progress_callback:
-            progress_callback("fetched", 20, 100, f"Fetched {len(work_items)} work items")
-
-        # Generate embeddings in batches
-        logger.info("Generating embeddings...")
-        synced_count = 0
-        total_items = len(work_items)
-
-        for i in range(0, len(work_items), batch_size):
-            batch = work_items[i:i + batch_size]
-
-            # Extract content for embedding
-            batch_contents = [item["content"] for item in batch]
-
-            # Generate embeddings
-            if progress_callback:
-                progress_pct = 20 + int((synced_count / total_items) * 60)
-                progress_callback("embedding", progress_pct, 100, 
-                                f"Generating embeddings: {synced_count}/{total_items}")
-            
-            embeddings = self.embedding_service.generate_embeddings_batch(
-                texts=batch_contents,
-                batch_size=16,  # API batch size
-            )
-
-            # Add embeddings to work items
-            for item, embedding in zip(batch, embeddings):
-                item["content_vector"] = embedding
-
-            # Upsert to search index
-            if progress_callback:
-                progress_pct = 20 + int((synced_count / total_items) * 70)
-                progress_callback("indexing", progress_pct, 100, 
-                                f"Indexing: {synced_count + len(batch)}/{total_items}")
-            
-            self.search_manager.upsert_documents(batch)
-
-            synced_count += len(batch)
-            logger.info(f"Synced {synced_count}/{len(work_items)} work items")
-
         # Clean up deleted items (only during full sync)
         if force_full_sync:
             logger.info("Checking for deleted work items...")
@@ -141,27 +165,39 @@ class SyncManager:
             # Get all work item IDs currently in Azure DevOps
             ado_work_item_ids = self.ado_connector.get_all_work_item_ids(self.project_name)
             
-            # Get all work item IDs from search index
-            index_work_item_ids = self.search_manager.get_all_work_item_ids()
+            # Get all work item IDs from search index (stored as strings, compared as ints)
+            index_work_item_ids = frozenset(
+                int(wid) for wid in self.search_manager.get_all_work_item_ids()
+            )
             
             # Find IDs that are in index but not in ADO (deleted items)
             deleted_ids = index_work_item_ids - ado_work_item_ids
             
             if deleted_ids:
                 logger.info(f"Found {len(deleted_ids)} deleted work items to remove from index")
-                self.search_manager.delete_documents(list(deleted_ids), self.project_name)
+                to_delete = [{"id": f"{self.project_name}_{wid}"} for wid in deleted_ids]
+                self.search_manager.delete_by_docs(to_delete)
                 logger.info(f"Removed {len(deleted_ids)} deleted work items from index")
             else:
                 logger.info("No deleted work items found")
 
         # Update sync metadata
-        current_time = datetime.utcnow()
+        current_time = datetime.now(timezone.utc)
         total_count = self.search_manager.get_work_item_count()
 
-        self.search_manager.update_sync_metadata(
-            last_sync_time=current_time,
-            work_item_count=total_count,
-        )
+        try:
+            self.search_manager.update_sync_metadata(
+                last_sync_time=current_time,
+                work_item_count=total_count,
+            )
+        except Exception:
+            # Work items are indexed; record how far we got so the next delta resumes there
+            if self.last_high_water_mark:
+                self._write_checkpoint(self.last_high_water_mark)
+            raise
+
+        self._write_sync_state(current_time)
+        self._clear_checkpoint()
 
         logger.info(
             f"Sync completed: {synced_count} items synced, {total_count} total items in index"
@@ -169,44 +205,275 @@ class SyncManager:
 
         return synced_count, total_count
 
-    def get_sync_status(self) -> Optional[Dict[str, Any]]:
+    async def _run_pipeline(
+        self,
+        last_sync_time: Optional[datetime],
+        batch_size: int,
+        progress_callback: Optional[callable],
+        queue_depth: int = 4,
+        upload_workers: int = 2,
+    ) -> int:
         """
-        Get current sync status.
+        Fetch, embed and index work items as three overlapping stages.
+
+        Stages are connected by bounded queues so that while one batch is being
+        embedded, the next is being fetched and the previous one uploaded.
+
+        Args:
+            last_sync_time: If provided, fetch only items changed after this time
+            batch_size: Number of items to process per batch
+            progress_callback: Optional callback function(step, current, total, message)
+            queue_depth: Maximum number of batches buffered between stages
+            upload_workers: Number of batches uploaded to the index concurrently
 
         Returns:
-            Dictionary with sync metadata or None
+            Number of work items synced
         """
-        return self.search_manager.get_sync_metadata()
+        fetch_progress = {"total": 0}
 
-    def test_connections(self) -> Dict[str, bool]:
+        def on_fetch_progress(fetched: int, total: int) -> None:
+            fetch_progress["total"] = total
+
+        work_items = self.ado_connector.iter_work_items(
+            project_name=self.project_name,
+            last_sync_time=last_sync_time,
+            progress_callback=on_fetch_progress,
+        )
+        batches = self._chunked(work_items, batch_size)
+
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+        upload_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+        counts = {"embedded": 0, "synced": 0}
+
+        def report(step: str, shown: int, label: str) -> None:
+            if not progress_callback:
+                return
+            # Total is the WIQL match count reported once the first fetch batch lands
+            total_items = max(fetch_progress["total"], shown, 1)
+            # Overall progress tracks indexed items so the bar never moves backwards
+            progress_pct = 20 + int((counts["synced"] / total_items) * 70)
+            progress_callback(step, progress_pct, 100, f"{label}: {shown}/{total_items}")
+
+        async def fetch_stage() -> None:
+            # The ADO generator blocks on network, so advance it in a worker thread
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                await embed_queue.put(batch)
+            await embed_queue.put(None)
+
+        async def embed_stage() -> None:
+            while True:
+                batch = await embed_queue.get()
+                if batch is None:
+                    break
+
+                # Contents and metadata are kept as parallel lists
+                batch_contents, batch_metadata = map(list, zip(*batch))
+
+                report("embedding", counts["embedded"], "Generating embeddings")
+                embeddings = await self.embedding_service.agenerate_embeddings_batch(
+                    texts=batch_contents,
+                )
+
+                # Attach content and embeddings to the index documents
+                for item, content, embedding in zip(batch_metadata, batch_contents, embeddings):
+                    item["content"] = content
+                    item["content_vector"] = embedding
+
+                counts["embedded"] += len(batch_metadata)
+                await upload_queue.put(batch_metadata)
+            await upload_queue.put(None)
+
+        async def upload_stage() -> None:
+            while True:
+                batch_metadata = await upload_queue.get()
+                if batch_metadata is None:
+                    # Pass the end marker on to the other upload workers
+                    await upload_queue.put(None)
+                    break
+
+                report("indexing", counts["synced"] + len(batch_metadata), "Indexing")
+                await asyncio.to_thread(self.search_manager.upsert_documents, batch_metadata)
+
+                for item in batch_metadata:
+                    changed_date = _parse_timestamp(item.get("changed_date"))
+                    if changed_date and (
+                        self.last_high_water_mark is None
+                        or changed_date > self.last_high_water_mark
+                    ):
+                        self.last_high_water_mark = changed_date
+
+                counts["synced"] += len(batch_metadata)
+                logger.info(f"Synced {counts['synced']} work items")
+
+        tasks = [
+            asyncio.ensure_future(stage())
+            for stage in (fetch_stage, embed_stage, *[upload_stage] * upload_workers)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave the other stages blocked on their queues
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # This run's event loop closes next; release its embedding connection pool
+            await self.embedding_service.aclose()
+
+        return counts["synced"]
+
+    def _read_checkpoint(self) -> Optional[datetime]:
         """
-        Test all service connections.
+        Read the local sync checkpoint for this project and index.
 
         Returns:
-            Dictionary with connection test results
+            Checkpointed high-water mark, or None if there is no usable checkpoint
+        """
+        try:
+            with open(self._checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            checkpoint.get("project_name") != self.project_name
+            or checkpoint.get("index_name") != self.search_manager.index_name
+        ):
+            return None
+        return _parse_timestamp(checkpoint.get("last_sync_time"))
+
+    def _write_checkpoint(self, high_water_mark: datetime) -> None:
         """
-        results = {}
+        Persist the sync high-water mark locally.
 
-        # Test ADO connection
+        Args:
+            high_water_mark: Latest changed_date among indexed work items
+        """
         try:
-            results["ado"] = self.ado_connector.test_connection(self.project_name)
-        except Exception as e:
-            logger.error(f"ADO connection test failed: {e}")
-            results["ado"] = False
+            os.makedirs(SYNC_STATE_DIR, exist_ok=True)
+            with open(self._checkpoint_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "project_name": self.project_name,
+                        "index_name": self.search_manager.index_name,
+                        "last_sync_time": high_water_mark.isoformat(),
+                    },
+                    f,
+                )
+            logger.info(f"Wrote local sync checkpoint: {high_water_mark}")
+        except OSError as e:
+            logger.warning(f"Could not write local sync checkpoint: {e}")
+
+    def _clear_checkpoint(self) -> None:
+        """Remove the local sync checkpoint once index metadata is up to date."""
+        try:
+            os.remove(self._checkpoint_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove local sync checkpoint: {e}")
+
+    def _read_sync_state(self) -> Optional[datetime]:
+        """
+        Read the locally stored time of the last successful sync.
 
-        # Test search index
+        Returns:
+            Last sync time, or None if there is no state for this project and index
+        """
         try:
-            results["search"] = self.search_manager.index_exists()
-        except Exception as e:
-            logger.error(f"Search connection test failed: {e}")
-            results["search"] = False
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if state.get("index_name") != self.search_manager.index_name:
+            return None
+        return _parse_timestamp(state.get("last_sync_time"))
 
-        # Test embedding service
+    def _write_sync_state(self, last_sync_time: datetime) -> None:
+        """
+        Atomically persist the time of the last successful sync.
+
+        The server-side metadata document is still updated, so other hosts
+        stay consistent; this copy only saves the metadata read on warm starts.
+
+        Args:
+            last_sync_time: Time the sync completed
+        """
+        tmp_path = f"{self._state_path}.tmp"
         try:
-            test_embedding = self.embedding_service.generate_embedding("test")
-            results["embedding"] = len(test_embedding) > 0
-        except Exception as e:
-            logger.error(f"Embedding service test failed: {e}")
-            results["embedding"] = False
+            os.makedirs(SYNC_STATE_DIR, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "index_name": self.search_manager.index_name,
+                        "last_sync_time": last_sync_time.isoformat(),
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self._state_path)
+        except OSError as e:
+            logger.warning(f"Could not write local sync state: {e}")
+
+    @staticmethod
+    def _chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+        """
+        Split an iterable into lists of at most size items.
+
+        Args:
+            items: Iterable to split
+            size: Maximum number of items per chunk
+
+        Yields:
+            Lists of consecutive items
+        """
+        iterator = iter(items)
+        while True:
+            chunk = list(itertools.islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def get_sync_status(self) -> Optional[Dict[str, Any]]:
+        """
+        Get current sync status.
+
+        Returns:
+            Dictionary with sync metadata or None
+        """
+        return self.search_manager.get_sync_metadata()
 
-        return results
+    def test_connections(self) -> Dict[str, bool]:
+        """
+        Test all service connections.
+
+        The probes are independent, so they run concurrently.
+
+        Returns:
+            Dictionary with connection test results
+        """
+        probes = {
+            "ado": ("ADO connection", lambda: self.ado_connector.test_connection(self.project_name)),
+            "search": ("Search connection", self.search_manager.index_exists),
+            "embedding": (
+                "Embedding service",
+                lambda: len(self.embedding_service.generate_embedding("test")) > 0,
+            ),
+        }
+
+        def run_probe(label: str, probe: Callable[[], bool]) -> bool:
+            try:
+                return probe()
+            except Exception as e:
+                logger.error(f"{label} test failed: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            futures = {
+                name: executor.submit(run_probe, label, probe)
+                for name, (label, probe) in probes.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
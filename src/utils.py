@@ -1,17 +1,55 @@
 """Utility functions for the application."""
 
+import functools
 import logging
 import os
+import sys
 from typing import Any, Dict
 
 from dotenv import load_dotenv
 
-# Try to import Streamlit for secrets support
+# Default secrets.toml locations; Streamlit is only imported for secrets if one exists
+# or the process is already running Streamlit
+_STREAMLIT_SECRETS_PATHS = (
+    os.path.join(".streamlit", "secrets.toml"),
+    os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+)
+
+# Configuration keys that must be set
+_REQUIRED_FIELDS = frozenset({
+    "ado_organization",
+    "ado_project_name",
+    "ado_pat",
+    "openai_endpoint",
+    "openai_api_key",
+    "search_endpoint",
+    "search_api_key",
+})
+
+# Environment variables behind the required keys; when all are already set (e.g. by a
+# container orchestrator) there is no need to look for a .env file
+_REQUIRED_ENV_VARS = (
+    "ADO_ORGANIZATION",
+    "ADO_PROJECT_NAME",
+    "ADO_PAT",
+    "AZURE_OPENAI_ENDPOINT",
+    "AZURE_OPENAI_KEY",
+    "AZURE_SEARCH_ENDPOINT",
+    "AZURE_SEARCH_KEY",
+)
+
+# Configuration keys that must be HTTPS URLs, with their environment variable names
+_HTTPS_FIELDS = (
+    ("ado_organization", "ADO_ORGANIZATION"),
+    ("openai_endpoint", "AZURE_OPENAI_ENDPOINT"),
+    ("search_endpoint", "AZURE_SEARCH_ENDPOINT"),
+)
+
+# Try to import configuration compiled from .env (see tools/compile_env.py)
 try:
-    import streamlit as st
-    HAS_STREAMLIT = True
+    from ._config_compiled import CONFIG as _COMPILED_CONFIG
 except ImportError:
-    HAS_STREAMLIT = False
+    _COMPILED_CONFIG = {}
 
 
 def setup_logging(log_level: str = "INFO") -> None:
@@ -28,6 +66,48 @@ def setup_logging(log_level: str = "INFO") -> None:
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _streamlit_secrets() -> Dict[str, Any]:
+    """
+    Load Streamlit secrets, importing Streamlit only when secrets can exist.
+
+    Command-line entry points such as test_config.py then skip the Streamlit
+    import entirely.
+
+    Returns:
+        Dictionary of Streamlit secrets, empty if unavailable
+    """
+    if "streamlit" not in sys.modules and not any(
+        os.path.isfile(path) for path in _STREAMLIT_SECRETS_PATHS
+    ):
+        return {}
+
+    try:
+        import streamlit as st
+        return dict(st.secrets)
+    except (ImportError, AttributeError, FileNotFoundError):
+        return {}
+
+
+@functools.lru_cache(maxsize=1)
+def _secrets_snapshot() -> Dict[str, Any]:
+    """
+    Snapshot configuration sources into one dictionary.
+
+    Streamlit secrets take precedence over environment variables, which take
+    precedence over compiled configuration, as they would over .env values.
+
+    Returns:
+        Dictionary of configuration values by key
+    """
+    snapshot: Dict[str, Any] = dict(_COMPILED_CONFIG)
+    snapshot.update(os.environ)
+
+    # Streamlit secrets (for Streamlit Cloud)
+    snapshot.update(_streamlit_secrets())
+    return snapshot
+
+
 def _get_secret(key: str, default: Any = None) -> Any:
     """
     Get secret from Streamlit secrets or environment variables.
@@ -39,31 +119,52 @@ def _get_secret(key: str, default: Any = None) -> Any:
     Returns:
         Configuration value
     """
-    # Try Streamlit secrets first (for Streamlit Cloud)
-    if HAS_STREAMLIT:
-        try:
-            if key in st.secrets:
-                return st.secrets[key]
-        except (AttributeError, FileNotFoundError):
-            pass
-    
-    # Fall back to environment variables
-    return os.getenv(key, default)
+    return _secrets_snapshot().get(key, default)
 
 
 def load_config() -> Dict[str, Any]:
     """
     Load configuration from Streamlit secrets or environment variables.
     
-    Supports both:
+    Supports:
     - Local development: .env files via python-dotenv
+    - Production builds: src/_config_compiled.py from tools/compile_env.py
     - Streamlit Cloud: st.secrets from secrets.toml
+
+    Configuration is loaded and validated once per process; each call returns
+    a copy, so callers cannot change the cached values. Call
+    ``load_config.cache_clear()`` to reload it.
     
     Returns:
         Dictionary containing configuration values
     """
-    # Load .env file for local development
-    load_dotenv()
+    return dict(_load_config())
+
+
+def _skip_dotenv() -> bool:
+    """
+    Check whether the environment is configured without a .env file.
+
+    Returns:
+        True if ADORAG_SKIP_DOTENV is "1" or every required variable is already set
+    """
+    env = os.environ
+    return env.get("ADORAG_SKIP_DOTENV") == "1" or all(
+        env.get(name) for name in _REQUIRED_ENV_VARS
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config() -> Dict[str, Any]:
+    """
+    Load and validate configuration; cached by load_config.
+
+    Returns:
+        Dictionary containing configuration values
+    """
+    # Load .env file for local development, unless it was compiled ahead of time
+    if not _COMPILED_CONFIG and not _skip_dotenv():
+        load_dotenv()
 
     config = {
         # Azure DevOps
@@ -80,31 +181,34 @@ def load_config() -> Dict[str, Any]:
         "search_endpoint": _get_secret("AZURE_SEARCH_ENDPOINT"),
         "search_api_key": _get_secret("AZURE_SEARCH_KEY"),
         "search_index_name": _get_secret("AZURE_SEARCH_INDEX_NAME", "ado-workitems"),
+        "hnsw_m": int(_get_secret("HNSW_M", 16)),
+        "hnsw_ef_construction": int(_get_secret("HNSW_EF_CONSTRUCTION", 200)),
+        "hnsw_ef_search": int(_get_secret("HNSW_EF_SEARCH", 100)),
         # Application
         "log_level": _get_secret("LOG_LEVEL", "INFO"),
     }
 
     # Validate required fields
-    required_fields = [
-        "ado_organization",
-        "ado_project_name",
-        "ado_pat",
-        "openai_endpoint",
-        "openai_api_key",
-        "search_endpoint",
-        "search_api_key",
-    ]
-
-    missing_fields = [field for field in required_fields if not config.get(field)]
+    missing_fields = _REQUIRED_FIELDS - {key for key, value in config.items() if value}
 
     if missing_fields:
         raise ValueError(
-            f"Missing required environment variables: {', '.join(missing_fields)}"
+            f"Missing required environment variables: {', '.join(sorted(missing_fields))}"
         )
 
     return config
 
 
+def _clear_config_cache() -> None:
+    """Forget cached configuration and secrets so the next load re-reads them."""
+    _streamlit_secrets.cache_clear()
+    _secrets_snapshot.cache_clear()
+    _load_config.cache_clear()
+
+
+load_config.cache_clear = _clear_config_cache
+
+
 def validate_config(config: Dict[str, Any]) -> bool:
     """
     Validate configuration values.
@@ -116,13 +220,8 @@ def validate_config(config: Dict[str, Any]) -> bool:
         True if valid, raises ValueError otherwise
     """
     # Validate URLs
-    if not config["ado_organization"].startswith("https://"):
-        raise ValueError("ADO_ORGANIZATION must be a valid HTTPS URL")
-
-    if not config["openai_endpoint"].startswith("https://"):
-        raise ValueError("AZURE_OPENAI_ENDPOINT must be a valid HTTPS URL")
-
-    if not config["search_endpoint"].startswith("https://"):
-        raise ValueError("AZURE_SEARCH_ENDPOINT must be a valid HTTPS URL")
+    for key, env_name in _HTTPS_FIELDS:
+        if not config[key].startswith("https://"):
+            raise ValueError(f"{env_name} must be a valid HTTPS URL")
 
     return True
@@ -4,26 +4,92 @@ Test configuration and validation script for ADO RAG.
 Run this script to validate your configuration before starting the application.
 """
 
+import importlib.util
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def print_header(text):
+# Application imports; a failure is recorded here and reported by the test that needs it
+IMPORT_ERRORS = {}
+
+try:
+    from dotenv import load_dotenv
+except ImportError as e:
+    IMPORT_ERRORS["dotenv"] = e
+
+try:
+    from src.utils import load_config, validate_config
+except ImportError as e:
+    IMPORT_ERRORS["config"] = e
+
+try:
+    from src.ado_service import ADOConnector
+except ImportError as e:
+    IMPORT_ERRORS["ado"] = e
+
+try:
+    from openai import AzureOpenAI
+    from src.embedding_service import EmbeddingService
+except ImportError as e:
+    IMPORT_ERRORS["openai"] = e
+
+try:
+    from src.search_service import SearchIndexManager
+except ImportError as e:
+    IMPORT_ERRORS["search"] = e
+
+# Environment variables the application requires
+REQUIRED_ENV_VARS = (
+    "ADO_ORGANIZATION",
+    "ADO_PROJECT_NAME",
+    "ADO_PAT",
+    "AZURE_OPENAI_ENDPOINT",
+    "AZURE_OPENAI_KEY",
+    "AZURE_SEARCH_ENDPOINT",
+    "AZURE_SEARCH_KEY",
+)
+
+# Environment variable names containing any of these hold secrets and are masked
+SENSITIVE_TOKENS = ("KEY", "PAT")
+
+# ANSI colors for status lines
+GREEN = "\033[92m"
+RED = "\033[91m"
+RESET = "\033[0m"
+
+# Report lines waiting to be written to stdout in one go
+OUTPUT = []
+
+
+def emit(line, out=None):
+    """Queue a line for output, or collect it in out instead."""
+    (OUTPUT if out is None else out).append(line)
+
+
+def flush_output():
+    """Write all queued lines to stdout at once."""
+    if OUTPUT:
+        sys.stdout.write("\n".join(OUTPUT) + "\n")
+        sys.stdout.flush()
+        OUTPUT.clear()
+
+
+def print_header(text, out=None):
     """Print formatted header."""
-    print("\n" + "=" * 60)
-    print(f"  {text}")
-    print("=" * 60)
+    emit("\n" + "=" * 60, out)
+    emit(f"  {text}", out)
+    emit("=" * 60, out)
 
 
-def print_status(test_name, passed, message=""):
+def print_status(test_name, passed, message="", out=None):
     """Print test status."""
     status = "✓ PASS" if passed else "✗ FAIL"
-    color = "\033[92m" if passed else "\033[91m"
-    reset = "\033[0m"
+    color = GREEN if passed else RED
     
-    print(f"{color}{status}{reset} - {test_name}")
+    emit(f"{color}{status}{RESET} - {test_name}", out)
     if message:
-        print(f"      {message}")
+        emit(f"      {message}", out)
 
 
 def test_python_version():
@@ -47,32 +113,24 @@ def test_environment_variables():
     """Test environment variables."""
     print_header("Environment Variables Check")
     
-    from dotenv import load_dotenv
-    load_dotenv()
+    if "dotenv" not in IMPORT_ERRORS:
+        load_dotenv()
     
-    required_vars = [
-        "ADO_ORGANIZATION",
-        "ADO_PROJECT_NAME",
-        "ADO_PAT",
-        "AZURE_OPENAI_ENDPOINT",
-        "AZURE_OPENAI_KEY",
-        "AZURE_SEARCH_ENDPOINT",
-        "AZURE_SEARCH_KEY",
-    ]
+    env = os.environ
+    values = [(var, env.get(var, "")) for var in REQUIRED_ENV_VARS]
     
     all_passed = True
     
-    for var in required_vars:
-        value = os.getenv(var)
-        passed = value is not None and value.strip() != ""
+    for var, value in values:
+        passed = value.strip() != ""
         all_passed = all_passed and passed
         
         if passed:
             # Mask sensitive values
-            if "KEY" in var or "PAT" in var:
-                display = value[:4] + "..." + value[-4:] if len(value) > 8 else "***"
+            if any(token in var for token in SENSITIVE_TOKENS):
+                display = f"{value[:4]}...{value[-4:]}" if len(value) > 8 else "***"
             else:
-                display = value[:50] + "..." if len(value) > 50 else value
+                display = f"{value[:50]}..." if len(value) > 50 else value
             print_status(var, True, display)
         else:
             print_status(var, False, "Not set or empty")
@@ -90,14 +148,16 @@ def test_dependencies():
         "azure.search.documents",
         "openai",
         "tiktoken",
-        "bs4",
+        "selectolax",
     ]
     
     all_passed = True
     
     for dep in dependencies:
         try:
-            __import__(dep)
+            # Locate the package without running its (often slow) top-level code
+            if importlib.util.find_spec(dep) is None:
+                raise ImportError(f"No module named '{dep}'")
             print_status(dep, True)
         except ImportError as e:
             print_status(dep, False, str(e))
@@ -106,15 +166,17 @@ def test_dependencies():
     return all_passed
 
 
-def test_ado_connection():
-    """Test Azure DevOps connection."""
-    print_header("Azure DevOps Connection Test")
+def test_ado_connection(config, out=None):
+    """Test Azure DevOps connection with the loaded config."""
+    print_header("Azure DevOps Connection Test", out)
+    
+    if config is None:
+        print_status("ADO Connection", False, "Configuration could not be loaded", out)
+        return False
     
     try:
-        from src.ado_service import ADOConnector
-        from src.utils import load_config
-        
-        config = load_config()
+        if "ado" in IMPORT_ERRORS:
+            raise IMPORT_ERRORS["ado"]
         
         connector = ADOConnector(
             organization_url=config["ado_organization"],
@@ -124,75 +186,82 @@ def test_ado_connection():
         result = connector.test_connection(config["ado_project_name"])
         
         print_status("ADO Connection", result, 
-                    f"Project: {config['ado_project_name']}")
+                    f"Project: {config['ado_project_name']}", out)
         
         return result
         
     except Exception as e:
-        print_status("ADO Connection", False, str(e))
+        print_status("ADO Connection", False, str(e), out)
         return False
 
 
-def test_openai_connection():
-    """Test Azure OpenAI connection."""
-    print_header("Azure OpenAI Connection Test")
+def test_openai_connection(config, out=None):
+    """Test Azure OpenAI connection with the loaded config."""
+    print_header("Azure OpenAI Connection Test", out)
+    
+    if config is None:
+        print_status("OpenAI Connection", False, "Configuration could not be loaded", out)
+        return False
     
     try:
-        from src.embedding_service import EmbeddingService
-        from src.utils import load_config
+        if "openai" in IMPORT_ERRORS:
+            raise IMPORT_ERRORS["openai"]
         
-        config = load_config()
+        # One client, and so one connection pool, for both probes
+        client = AzureOpenAI(
+            azure_endpoint=config["openai_endpoint"],
+            api_key=config["openai_api_key"],
+            api_version=config["openai_api_version"],
+        )
         
         service = EmbeddingService(
             endpoint=config["openai_endpoint"],
             api_key=config["openai_api_key"],
             api_version=config["openai_api_version"],
             deployment_name=config["openai_embedding_deployment"],
+            client=client,
         )
         
-        # Test embedding generation
-        embedding = service.generate_embedding("test")
+        # Test embedding generation and the chat deployment at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            embedding_future = executor.submit(service.generate_embedding, "test")
+            chat_future = executor.submit(
+                client.chat.completions.create,
+                model=config["openai_chat_deployment"],
+                messages=[{"role": "user", "content": "test"}],
+                max_tokens=10,
+            )
+            embedding = embedding_future.result()
+            response = chat_future.result()
+        
         passed = len(embedding) == 1536
         
         print_status("OpenAI Embedding", passed, 
-                    f"Deployment: {config['openai_embedding_deployment']}, Dimension: {len(embedding)}")
-        
-        # Test chat deployment
-        from openai import AzureOpenAI
-        
-        client = AzureOpenAI(
-            azure_endpoint=config["openai_endpoint"],
-            api_key=config["openai_api_key"],
-            api_version=config["openai_api_version"],
-        )
-        
-        response = client.chat.completions.create(
-            model=config["openai_chat_deployment"],
-            messages=[{"role": "user", "content": "test"}],
-            max_tokens=10,
-        )
+                    f"Deployment: {config['openai_embedding_deployment']}, Dimension: {len(embedding)}", out)
         
         chat_passed = response.choices[0].message.content is not None
         
         print_status("OpenAI Chat", chat_passed,
-                    f"Deployment: {config['openai_chat_deployment']}")
+                    f"Deployment: {config['openai_chat_deployment']}", out)
         
         return passed and chat_passed
         
     except Exception as e:
-        print_status("OpenAI Connection", False, str(e))
+        print_status("OpenAI Connection", False, str(e), out)
         return False
 
 
-def test_search_connection():
-    """Test Azure AI Search connection."""
-    print_header("Azure AI Search Connection Test")
+def test_search_connection(config, out=None):
+    """Test Azure AI Search connection with the loaded config."""
+    print_header("Azure AI Search Connection Test", out)
+    
+    if config is None:
+        print_status("Search Service", False, "Configuration could not be loaded", out)
+        return False
     
     try:
-        from src.search_service import SearchIndexManager
-        from src.utils import load_config
-        
-        config = load_config()
+        if "search" in IMPORT_ERRORS:
+            raise IMPORT_ERRORS["search"]
         
         manager = SearchIndexManager(
             endpoint=config["search_endpoint"],
@@ -204,7 +273,7 @@ def test_search_connection():
         exists = manager.index_exists()
         
         print_status("Search Service", True,
-                    f"Index '{config['search_index_name']}' {'exists' if exists else 'will be created'}")
+                    f"Index '{config['search_index_name']}' {'exists' if exists else 'will be created'}", out)
         
         if exists:
             count = manager.get_work_item_count()
@@ -212,22 +281,24 @@ def test_search_connection():
             
             if metadata:
                 last_sync = metadata.get("last_sync_time")
-                print(f"      Last sync: {last_sync}")
-                print(f"      Work items: {count}")
+                emit(f"      Last sync: {last_sync}", out)
+                emit(f"      Work items: {count}", out)
         
         return True
         
     except Exception as e:
-        print_status("Search Service", False, str(e))
+        print_status("Search Service", False, str(e), out)
         return False
 
 
 def test_configuration():
-    """Test configuration validation."""
+    """Test configuration validation; returns (passed, config or None if not loaded)."""
     print_header("Configuration Validation")
     
+    config = None
     try:
-        from src.utils import load_config, validate_config
+        if "config" in IMPORT_ERRORS:
+            raise IMPORT_ERRORS["config"]
         
         config = load_config()
         result = validate_config(config)
@@ -235,26 +306,34 @@ def test_configuration():
         print_status("Config Validation", result)
         
         # Print configuration summary
-        print("\nConfiguration Summary:")
-        print(f"  ADO Project: {config['ado_project_name']}")
-        print(f"  Search Index: {config['search_index_name']}")
-        print(f"  Embedding Model: {config['openai_embedding_deployment']}")
-        print(f"  Chat Model: {config['openai_chat_deployment']}")
-        print(f"  Log Level: {config['log_level']}")
+        emit("\nConfiguration Summary:")
+        emit(f"  ADO Project: {config['ado_project_name']}")
+        emit(f"  Search Index: {config['search_index_name']}")
+        emit(f"  Embedding Model: {config['openai_embedding_deployment']}")
+        emit(f"  Chat Model: {config['openai_chat_deployment']}")
+        emit(f"  Log Level: {config['log_level']}")
         
-        return result
+        return result, config
         
     except Exception as e:
         print_status("Config Validation", False, str(e))
-        return False
+        return False, config
 
 
 def main():
     """Run all tests."""
-    print("\n")
-    print("╔═══════════════════════════════════════════════════════════╗")
-    print("║           ADO RAG Configuration Validator                 ║")
-    print("╚═══════════════════════════════════════════════════════════╝")
+    try:
+        return run_tests()
+    finally:
+        flush_output()
+
+
+def run_tests():
+    """Run all tests, queueing the report; returns the exit code."""
+    emit("\n")
+    emit("╔═══════════════════════════════════════════════════════════╗")
+    emit("║           ADO RAG Configuration Validator                 ║")
+    emit("╚═══════════════════════════════════════════════════════════╝")
     
     results = []
     
@@ -262,10 +341,28 @@ def main():
     results.append(("Python Version", test_python_version()))
     results.append(("Environment Variables", test_environment_variables()))
     results.append(("Dependencies", test_dependencies()))
-    results.append(("Configuration", test_configuration()))
-    results.append(("ADO Connection", test_ado_connection()))
-    results.append(("OpenAI Connection", test_openai_connection()))
-    results.append(("Search Connection", test_search_connection()))
+    config_passed, config = test_configuration()
+    results.append(("Configuration", config_passed))
+    
+    # Show the local checks while the network tests run
+    flush_output()
+    
+    # The connection tests are independent network round-trips, so run them at
+    # the same time and print their reports in a fixed order afterwards
+    connection_tests = [
+        ("ADO Connection", test_ado_connection),
+        ("OpenAI Connection", test_openai_connection),
+        ("Search Connection", test_search_connection),
+    ]
+    outputs = [[] for _ in connection_tests]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        passed_flags = list(executor.map(
+            lambda test, out: test(config, out), [test for _, test in connection_tests], outputs
+        ))
+    
+    for (name, _), out, passed in zip(connection_tests, outputs, passed_flags):
+        OUTPUT.extend(out)
+        results.append((name, passed))
     
     # Print summary
     print_header("Test Summary")
@@ -276,14 +373,14 @@ def main():
     for name, passed in results:
         print_status(name, passed)
     
-    print(f"\nTotal: {passed_count}/{total_count} tests passed")
+    emit(f"\nTotal: {passed_count}/{total_count} tests passed")
     
     if passed_count == total_count:
-        print("\n✅ All tests passed! You're ready to run the application.")
-        print("\nRun: streamlit run app.py")
+        emit("\n✅ All tests passed! You're ready to run the application.")
+        emit("\nRun: streamlit run app.py")
         return 0
     else:
-        print("\n❌ Some tests failed. Please fix the issues above before running the application.")
+        emit("\n❌ Some tests failed. Please fix the issues above before running the application.")
         return 1
 
 
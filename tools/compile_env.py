@@ -0,0 +1,53 @@
+"""
+Compile a .env file into a Python configuration module for ADO RAG.
+
+The generated src/_config_compiled.py is imported by src.utils in place of
+parsing .env at runtime. It contains secrets: never commit it, and only
+bake it into images that are kept private.
+
+Usage:
+    python tools/compile_env.py [path/to/.env]
+"""
+
+import os
+import pprint
+import sys
+
+from dotenv import dotenv_values
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_PATH = os.path.join(ROOT, "src", "_config_compiled.py")
+
+
+def compile_env(env_path: str, output_path: str = OUTPUT_PATH) -> int:
+    """
+    Write the values of a .env file as a literal CONFIG dictionary.
+
+    Args:
+        env_path: Path to the .env file
+        output_path: Path of the module to generate
+
+    Returns:
+        Number of values written
+    """
+    values = {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+
+    # The module holds secrets, so create it readable by the owner only
+    tmp_path = f"{output_path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(tmp_path, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write('"""Configuration compiled from .env by tools/compile_env.py. Do not commit."""\n\n')
+        f.write(f"CONFIG = {pprint.pformat(values, sort_dicts=True)}\n")
+    os.replace(tmp_path, output_path)
+    return len(values)
+
+
+if __name__ == "__main__":
+    env_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, ".env")
+    if not os.path.isfile(env_path):
+        print(f"❌ .env file not found: {env_path}")
+        sys.exit(1)
+
+    count = compile_env(env_path)
+    print(f"✅ Wrote {count} values to {OUTPUT_PATH}")